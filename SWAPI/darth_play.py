@@ -9,7 +9,9 @@ vehicles_url = f"{baseurl}/vehicles/"
 species_url = f"{baseurl}/species/"
 planets_url = f"{baseurl}/planets/"
 
-def summon_darth(baseurl, resource="", params = {}):
+def summon_darth(baseurl, resource="", params = {}, client=None):
+    if client is not None:
+        return client.get_json(baseurl + resource, params)
     response = requests.get(baseurl + resource, params=params).json()
     return response
 
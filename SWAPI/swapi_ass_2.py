@@ -1,6 +1,9 @@
 import json
 import requests
 
+from swapi_cache import CACHE_FILE, ResponseCache
+from swapi_client import SwapiClient
+
 ENDPOINT = 'https://swapi.co/api'
 SPECIES_URL = '/species/'
 PEOPLE_URL = '/people/'
@@ -54,11 +57,12 @@ def assign_crew(starship, crew):
     return starship
 
 
-def clean_data(entity):
+def clean_data(entity, cache=None):
     """Converts dictionary string values to more appropriate types such as float, int, list, or None.
 
     Parameters:
         entity (dict): dictionary with values to be cleaned.
+        cache (ResponseCache): optional response cache used for nested resource lookups.
 
 
     Returns:
@@ -95,13 +99,13 @@ def clean_data(entity):
             cleaned[key] = convert_string_to_list(value, ', ')
         elif key in dict_props:
             if key == 'homeworld':
-                swapi_data = get_swapi_resource(value)
+                swapi_data = get_swapi_resource(value, cache=cache)
                 filtered_data = filter_data(swapi_data, PLANET_KEYS)
-                cleaned[key] = clean_data(filtered_data)
+                cleaned[key] = clean_data(filtered_data, cache)
             if key == 'species':
-                swapi_data = get_swapi_resource(value[0])
+                swapi_data = get_swapi_resource(value[0], cache=cache)
                 filtered_data = filter_data(swapi_data, SPECIES_KEYS)
-                cleaned[key] = [clean_data(filtered_data)]
+                cleaned[key] = [clean_data(filtered_data, cache)]
         else:
             cleaned[key] = value
 
@@ -202,7 +206,7 @@ def filter_data(data, filter_keys):
     return filtered_dict
 
 
-def get_swapi_resource(url, params=None):
+def get_swapi_resource(url, params=None, cache=None, client=None):
     """Issues an HTTP GET request to return a representation of a resource. If no category is
     provided, the root resource will be returned. An optional query string of key:value pairs
     may be provided as search terms (e.g., {'search': 'yoda'}). If a match is achieved the
@@ -212,11 +216,20 @@ def get_swapi_resource(url, params=None):
     Parameters:
         url (str): a url that specifies the resource.
         params (dict): optional dictionary of querystring arguments.
+        cache (ResponseCache): optional persistent response cache. Fresh entries are served
+            without a network round trip; stale entries are revalidated.
+        client (SwapiClient): optional pooled keep-alive client with retry/backoff, used when no
+            cache is provided.
 
     Returns:
         dict: decoded JSON document expressed as dictionary.
     """
 
+    if cache is not None:
+        return cache.get_json(url, params)
+    if client is not None:
+        return client.get_json(url, params)
+
     response = requests.get(url, params=params).json()
     return response
 
@@ -267,7 +280,7 @@ def write_json(filepath, data):
         json.dump(data, file_obj, ensure_ascii=False, indent=2)
 
 
-def main():
+def main(offline=False):
     """Entry point. This program will interact with local file assets and the Star Wars
     API to create two data files required by Rebel Alliance Intelligence.
 
@@ -280,12 +293,14 @@ def main():
       (with astromech droid R2-D2) and Wedge Antilles (with astromech droid R5-D4).
 
     Parameters:
-        None
+        offline (bool): serve SWAPI resources from the response cache only.
 
     Returns:
         None
     """
 
+    cache = ResponseCache(CACHE_FILE, offline=offline, client=SwapiClient())
+
     #swapi_planets_uninhabited json file
     uninhabited = []
     file_in = 'swapi_planets-v1p0.json'
@@ -295,7 +310,7 @@ def main():
     for d in planet_dicts:
         if is_unknown(d['population']):
             filtered = filter_data(d, PLANET_KEYS)
-            cleaned = clean_data(filtered)
+            cleaned = clean_data(filtered, cache)
             uninhabited.append(cleaned)
 
     write_json(file_out, uninhabited)
@@ -309,82 +324,82 @@ def main():
     swapi_planets_url = f"{ENDPOINT}/planets/"
 
     swapi_hoth = get_swapi_resource(
-        swapi_planets_url, {'search': 'Hoth'})['results'][0]
+        swapi_planets_url, {'search': 'Hoth'}, cache)['results'][0]
     echo_base_hoth = echo_base['location']['planet']
     hoth = combine_data(echo_base_hoth, swapi_hoth)
     hoth = filter_data(hoth, HOTH_KEYS)
-    hoth = clean_data(hoth)
+    hoth = clean_data(hoth, cache)
     echo_base['location']['planet'] = hoth
 
     #commander data
     echo_base_commander = echo_base['garrison']['commander']
-    echo_base_commander = clean_data(echo_base_commander)
+    echo_base_commander = clean_data(echo_base_commander, cache)
     echo_base['garrison']['commander'] = echo_base_commander
 
     #enrich dash rendar
     echo_base_dash = echo_base['visiting_starships']['freighters'][1]['pilot']
-    echo_base_dash = clean_data(echo_base_dash)
+    echo_base_dash = clean_data(echo_base_dash, cache)
     echo_base['visiting_starships']['freighters'][1]['pilot'] = echo_base_dash
 
     #enrich snowspeeder data
     swapi_vehicles_url = f"{ENDPOINT}/vehicles/"
     swapi_snowspeeder = get_swapi_resource(
-        swapi_vehicles_url, {'search': 'snowspeeder'})['results'][0]
+        swapi_vehicles_url, {'search': 'snowspeeder'}, cache)['results'][0]
 
     echo_base_snowspeeder = echo_base['vehicle_assets']['snowspeeders'][0]['type']
 
     snowspeeder = combine_data(echo_base_snowspeeder, swapi_snowspeeder)
     snowspeeder = filter_data(snowspeeder, VEHICLE_KEYS)
-    snowspeeder = clean_data(snowspeeder)
+    snowspeeder = clean_data(snowspeeder, cache)
     echo_base['vehicle_assets']['snowspeeders'][0]['type'] = snowspeeder
 
     #enrich t-65 x-wing
     swapi_starship_url = f"{ENDPOINT}/starships/"
     swapi_xwing = get_swapi_resource(
-        swapi_starship_url, {'search': 'T-65 X-wing'})['results'][0]
+        swapi_starship_url, {'search': 'T-65 X-wing'}, cache)['results'][0]
 
     echo_base_xwing = echo_base['starship_assets']['starfighters'][0]['type']
 
     xwing = combine_data(echo_base_xwing, swapi_xwing)
     xwing = filter_data(xwing, STARSHIP_KEYS)
-    xwing = clean_data(xwing)
+    xwing = clean_data(xwing, cache)
     echo_base['starship_assets']['starfighters'][0]['type'] = xwing
 
     #enrich GR-75 medium transport
     swapi_gr75 = get_swapi_resource(
-        swapi_starship_url, {'search': 'GR-75 medium transport'})['results'][0]
+        swapi_starship_url, {'search': 'GR-75 medium transport'}, cache)['results'][0]
 
     echo_base_gr75 = echo_base['starship_assets']['transports'][0]['type']
 
     gr_75 = combine_data(echo_base_gr75, swapi_gr75)
     gr_75 = filter_data(gr_75, STARSHIP_KEYS)
-    gr_75 = clean_data(gr_75)
+    gr_75 = clean_data(gr_75, cache)
     echo_base['starship_assets']['transports'][0]['type'] = gr_75
 
     #enrich Millennium Falcon
     swapi_falcon = get_swapi_resource(
-        swapi_starship_url, {'search': 'Millennium Falcon'})['results'][0]
+        swapi_starship_url, {'search': 'Millennium Falcon'}, cache)['results'][0]
     echo_base_falcon = echo_base['visiting_starships']['freighters'][0]
 
     m_falcon = combine_data(echo_base_falcon, swapi_falcon)
     m_falcon = filter_data(m_falcon, STARSHIP_KEYS)
-    m_falcon = clean_data(m_falcon)
+    m_falcon = clean_data(m_falcon, cache)
     echo_base['visiting_starships']['freighters'][0] = m_falcon
 
     #Assign crew to the Millennium Falcon
 
     #retrieve han
     swapi_people_url = f"{ENDPOINT}/people/"
-    han = get_swapi_resource(swapi_people_url, {'search': 'han solo'})[
+    han = get_swapi_resource(swapi_people_url, {'search': 'han solo'}, cache)[
         'results'][0]
     han = filter_data(han, PEOPLE_KEYS)
-    han = clean_data(han)
+    han = clean_data(han, cache)
 
     #retrieve Chewbacca
-    chewie = get_swapi_resource(swapi_people_url, {'search': 'Chewbacca'})[
+    chewie = get_swapi_resource(swapi_people_url, {'search': 'Chewbacca'}, cache)[
         'results'][0]
     chewie = filter_data(chewie, PEOPLE_KEYS)
-    chewie = clean_data(chewie)
+    chewie = clean_data(chewie, cache)
 
     #assign han and chewbacca
     m_falcon = assign_crew(m_falcon, {'pilot': han, 'copilot': chewie})
@@ -413,16 +428,16 @@ def main():
     evac_transport['passenger_manifest'] = []
 
     #retrieve leia organa
-    leia_o = get_swapi_resource(swapi_people_url, {'search': 'Leia Organa'})[
+    leia_o = get_swapi_resource(swapi_people_url, {'search': 'Leia Organa'}, cache)[
         'results'][0]
     leia_o = filter_data(leia_o, PEOPLE_KEYS)
-    leia_o = clean_data(leia_o)
+    leia_o = clean_data(leia_o, cache)
 
     #retrieve C-3PO
     c_3po = get_swapi_resource(
-        swapi_people_url, {'search': 'C-3PO'})['results'][0]
+        swapi_people_url, {'search': 'C-3PO'}, cache)['results'][0]
     c_3po = filter_data(c_3po, PEOPLE_KEYS)
-    c_3po = clean_data(c_3po)
+    c_3po = clean_data(c_3po, cache)
 
     #assign the two passengers
     evac_transport['passenger_manifest'].append(leia_o)
@@ -434,26 +449,26 @@ def main():
     luke_x_wing = xwing_copy.copy()
     wedge_x_wing = xwing_copy.copy()
 
-    luke = get_swapi_resource(swapi_people_url, {'search': 'Luke Skywalker'})[
+    luke = get_swapi_resource(swapi_people_url, {'search': 'Luke Skywalker'}, cache)[
         'results'][0]
     luke = filter_data(luke, PEOPLE_KEYS)
-    luke = clean_data(luke)
+    luke = clean_data(luke, cache)
     r2_d2 = get_swapi_resource(
-        swapi_people_url, {'search': 'R2-D2'})['results'][0]
+        swapi_people_url, {'search': 'R2-D2'}, cache)['results'][0]
     r2_d2 = filter_data(r2_d2, PEOPLE_KEYS)
-    r2_d2 = clean_data(r2_d2)
+    r2_d2 = clean_data(r2_d2, cache)
     luke_x_wing = assign_crew(
         luke_x_wing, {'pilot': luke, 'astromech_droid': r2_d2})
     evac_transport['escorts'].append(luke_x_wing)
 
-    wedge = get_swapi_resource(swapi_people_url, {'search': 'Wedge Antilles'})[
+    wedge = get_swapi_resource(swapi_people_url, {'search': 'Wedge Antilles'}, cache)[
         'results'][0]
     wedge = filter_data(wedge, PEOPLE_KEYS)
-    wedge = clean_data(wedge)
+    wedge = clean_data(wedge, cache)
     r5_d4 = get_swapi_resource(
-        swapi_people_url, {'search': 'R5-D4'})['results'][0]
+        swapi_people_url, {'search': 'R5-D4'}, cache)['results'][0]
     r5_d4 = filter_data(r5_d4, PEOPLE_KEYS)
-    r5_d4 = clean_data(r5_d4)
+    r5_d4 = clean_data(r5_d4, cache)
     wedge_x_wing = assign_crew(
         wedge_x_wing, {'pilot': wedge, 'astromech_droid': r5_d4})
     evac_transport['escorts'].append(wedge_x_wing)
@@ -1,7 +1,26 @@
+import functools
 import json
+import re
 import requests
+import threading
+
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from swapi_cache import CACHE_FILE, ResponseCache
+from swapi_client import SwapiClient
+from swapi_evac import lift_capacity
+from swapi_lazy import LazyRef, has_pending, resolve_batches, resolve_refs
+from swapi_mirror import SEARCH_FIELDS, SwapiMirror
+from swapi_overlay import derive, json_default
+import swapi_stats
+from swapi_stats import current_stage, finish_fetch, in_stage, note, stage, start_fetch, timed
+from swapi_store import EntityStore, write_store
 
 ENDPOINT = 'https://swapi.co/api'
+MAX_WORKERS = 16
+PREFETCH_PAGES = 2  # collection pages fetched ahead of the consumer by iter_collection
 
 PEOPLE_KEYS = (
     'url', 'name', 'mass', 'hair_color', 'skin_color', 'eye_color', 'birth_year',
@@ -35,6 +54,61 @@ VEHICLE_KEYS = (
     'crew', 'passengers', 'cargo_capacity', 'consumables', 'armament',
 )
 
+FLOAT_PROPS = frozenset((
+    'gravity', 'length', 'width', 'hyperdrive_rating',
+))
+
+INT_PROPS = frozenset((
+    'rotation_period', 'orbital_period', 'diameter', 'surface_water', 'population', 'height', 'mass',
+    'average_height', 'average_lifespan', 'max_atmosphering_speed', 'MGLT', 'crew', 'passengers', 'cargo_capacity',
+))
+
+LIST_PROPS = frozenset((
+    'hair_color', 'skin_color', 'climate', 'terrain', 'skin_colors', 'hair_colors', 'eye_colors',
+))
+
+DICT_PROPS = frozenset((
+    'homeworld', 'species',
+))
+
+UNKNOWN_VALUES = frozenset(('unknown', 'n/a'))
+
+STREAM_CHUNK_SIZE = 1 << 16  # characters read per chunk by read_json_array
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# filter keys -> compiled cleaning plan (see compile_plan)
+cleaning_plans = {}
+
+# url -> Future holding the cleaned nested entity (homeworld, species)
+nested_entities = {}
+nested_entities_lock = threading.Lock()
+nested_entity_stats = {'hits': 0, 'misses': 0}
+
+
+@timed
+def apply_plan(plan, data, default_data=None, cache=None):
+    """Filters, combines and cleans an entity in a single pass using a compiled plan. Equivalent
+    to clean_data(filter_data(combine_data(default_data, data), filter_keys)) without building
+    the intermediate dictionaries.
+
+    Parameters:
+        plan (tuple): compiled plan returned by compile_plan().
+        data (dict): source entity; its values override the defaults.
+        default_data (dict): optional default key-value pairs.
+        cache (ResponseCache): optional response cache used for nested resource lookups.
+
+    Returns:
+        dict: a new entity with the plan's keys (in plan order) and cleaned values.
+    """
+    cleaned = {}
+    for key, convert in plan:
+        if key in data:
+            cleaned[key] = convert(data[key], cache)
+        elif default_data is not None and key in default_data:
+            cleaned[key] = convert(default_data[key], cache)
+    return cleaned
+
+
 def assign_crew(starship, crew):
     """ The function assigns crew members to a starship.
 
@@ -51,58 +125,58 @@ def assign_crew(starship, crew):
     return starship
 
 
-def clean_data(entity):
+@timed
+def clean_data(entity, cache=None, lazy=False):
     """Converts string values to appropriate types (float, int, list, None). Manages property
     checks with tuples of named keys.
 
     Parameters:
         entity (dict): dictionary with values to be cleaned.
+        cache (ResponseCache): optional response cache used for nested resource lookups.
+        lazy (bool): replace homeworld and species urls with LazyRef proxies (swapi_lazy)
+            that are only fetched when read or written.
 
     Returns:
         dict: dictionary with cleaned values.
     """
-    float_props = (
-        'gravity', 'length', 'width', 'hyperdrive_rating',
-    )
-    int_props = (
-        'rotation_period', 'orbital_period', 'diameter', 'surface_water', 'population', 'height', 'mass',
-        'average_height', 'average_lifespan', 'max_atmosphering_speed', 'MGLT', 'crew', 'passengers', 'cargo_capacity',
-    )
-    list_props = (
-        'hair_color', 'skin_color', 'climate', 'terrain', 'skin_colors', 'hair_colors', 'eye_colors',
-
-    )
-    dict_props = (
-        'homeworld', 'species',
-    )
-
     cleaned = {}
     for key, value in entity.items():
         if type(value) == str and is_unknown(value):
             cleaned[key] = None
-        elif key in float_props:
+        elif key in FLOAT_PROPS:
             if key == 'gravity':
                 value = value.replace('standard', ' ').strip()
             cleaned[key] = convert_string_to_float(value)
-        elif key in int_props:
+        elif key in INT_PROPS:
             cleaned[key] = convert_string_to_int(value)
-        elif key in list_props:
+        elif key in LIST_PROPS:
             cleaned[key] = convert_string_to_list(value, ', ')
-        elif key in dict_props:
+        elif key in DICT_PROPS:
             if key == 'homeworld':
-                swapi_data = get_swapi_resource(value)
-                filtered_data = filter_data(swapi_data, PLANET_KEYS)
-                cleaned[key] = clean_data(filtered_data)
+                cleaned[key] = _nested(value, PLANET_KEYS, cache, lazy)
             if key == 'species':
-                swapi_data = get_swapi_resource(value[0])
-                filtered_data = filter_data(swapi_data, SPECIES_KEYS)
-                cleaned[key] = [clean_data(filtered_data)]
+                cleaned[key] = [_nested(value[0], SPECIES_KEYS, cache, lazy)]
         else:
             cleaned[key] = value
 
     return cleaned
 
 
+@timed
+def clean_many(entities, plan, cache=None):
+    """Cleans a batch of entities with a compiled plan.
+
+    Parameters:
+        entities (iterable): source entities.
+        plan (tuple): compiled plan returned by compile_plan().
+        cache (ResponseCache): optional response cache used for nested resource lookups.
+
+    Returns:
+        list: cleaned entities in input order.
+    """
+    return [apply_plan(plan, entity, None, cache) for entity in entities]
+
+
 def combine_data(default_data, override_data):
     """Creates a shallow copy of the default dictionary then updates the copy with
     specified key-value pairs that override values on matching keys. If a deep copy is
@@ -122,6 +196,129 @@ def combine_data(default_data, override_data):
     return combined_data
 
 
+def compile_plan(filter_keys, lazy=False):
+    """Compiles a tuple of filter keys into a cleaning plan: a tuple of (key, converter) pairs
+    in key order, where each converter applies the same rules clean_data() uses for that key.
+    Plans are compiled once per tuple of keys and reused.
+
+    Parameters:
+        filter_keys (tuple): sequence of keys (e.g., PLANET_KEYS).
+        lazy (bool): compile homeworld and species to LazyRef proxies (see clean_data).
+
+    Returns:
+        tuple: compiled plan for apply_plan() and clean_many().
+    """
+    plan_key = (filter_keys, True) if lazy else filter_keys
+    plan = cleaning_plans.get(plan_key)
+    if plan is None:
+        plan = tuple((key, _select_converter(key, lazy)) for key in filter_keys)
+        cleaning_plans[plan_key] = plan
+    return plan
+
+
+def _select_converter(key, lazy=False):
+    """Returns the plan converter for a key (see compile_plan)."""
+    if lazy and key in DICT_PROPS:
+        return _lazy_homeworld if key == 'homeworld' else _lazy_species
+    if key == 'gravity':
+        return _clean_gravity
+    if key in FLOAT_PROPS:
+        return _clean_float
+    if key in INT_PROPS:
+        return _clean_int
+    if key in LIST_PROPS:
+        return _clean_list
+    if key == 'homeworld':
+        return _clean_homeworld
+    if key == 'species':
+        return _clean_species
+    return _clean_other
+
+
+def skip_unknown(convert):
+    """Decorator for plan converters: unknown sentinel values ('unknown', 'n/a' in any case,
+    see is_unknown) clean to None and every other value is passed on to the converter.
+
+    Parameters:
+        convert (function): convert(value, cache) returning the cleaned value.
+
+    Returns:
+        function: converter with the same signature.
+    """
+
+    @functools.wraps(convert)
+    def converter(value, cache):
+        #is_unknown inlined: this runs once per cleaned value
+        if type(value) is str and value.lower().strip() in UNKNOWN_VALUES:
+            return None
+        return convert(value, cache)
+
+    return converter
+
+
+@skip_unknown
+def _clean_float(value, cache):
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+@skip_unknown
+def _clean_gravity(value, cache):
+    return _clean_float(value.replace('standard', ' ').strip(), cache)
+
+
+@skip_unknown
+def _clean_int(value, cache):
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+@skip_unknown
+def _clean_list(value, cache):
+    return value.split(', ')
+
+
+@skip_unknown
+def _clean_homeworld(value, cache):
+    return get_nested_entity(value, PLANET_KEYS, cache)
+
+
+@skip_unknown
+def _clean_species(value, cache):
+    return [get_nested_entity(value[0], SPECIES_KEYS, cache)]
+
+
+@skip_unknown
+def _lazy_homeworld(value, cache):
+    return LazyRef(value, PLANET_KEYS, cache, get_nested_entity)
+
+
+@skip_unknown
+def _lazy_species(value, cache):
+    return [LazyRef(value[0], SPECIES_KEYS, cache, get_nested_entity)]
+
+
+@skip_unknown
+def _clean_other(value, cache):
+    return value
+
+
+# converter kind -> plan converter (used to build plans from inferred schemas, see swapi_schema)
+CONVERTERS = {
+    'float': _clean_float,
+    'gravity': _clean_gravity,
+    'int': _clean_int,
+    'list': _clean_list,
+    'homeworld': _clean_homeworld,
+    'species': _clean_species,
+    'other': _clean_other,
+}
+
+
 def convert_string_to_float(value):
     """Attempts to convert a string to a float.  If unsuccessful returns
     the value unchanged.
@@ -177,6 +374,7 @@ def convert_string_to_list(value, delimiter=','):
         return value
 
 
+@timed
 def filter_data(data, filter_keys):
     """ Given data and keys, data will be sorted according to the order of the keys.
 
@@ -194,177 +392,496 @@ def filter_data(data, filter_keys):
     return filtered_dict
 
 
-def get_swapi_resource(url, params=None):
+def _nested(url, filter_keys, cache, lazy):
+    if lazy:
+        return LazyRef(url, filter_keys, cache, get_nested_entity)
+    return get_nested_entity(url, filter_keys, cache)
+
+
+def get_nested_entity(url, filter_keys, cache=None):
+    """Returns the filtered and cleaned SWAPI entity located at url. Each url is fetched and
+    cleaned once per run: later callers receive the memoized entity and concurrent callers
+    asking for a url that is already being fetched wait on that fetch instead of issuing their
+    own. Hits and misses are counted in nested_entity_stats.
+
+    Parameters:
+        url (str): the url of the nested entity (e.g., a homeworld or species).
+        filter_keys (tuple): keys used to filter the entity before it is cleaned.
+        cache (ResponseCache): optional persistent response cache.
+
+    Returns:
+        dict: the filtered and cleaned entity (shared between callers; do not mutate).
+    """
+    with nested_entities_lock:
+        future = nested_entities.get(url)
+        owner = future is None
+        if owner:
+            future = Future()
+            nested_entities[url] = future
+            nested_entity_stats['misses'] += 1
+        else:
+            nested_entity_stats['hits'] += 1
+
+    if owner:
+        try:
+            swapi_data = get_swapi_resource(url, cache=cache)
+            future.set_result(apply_plan(compile_plan(filter_keys), swapi_data, None, cache))
+        except Exception as err:
+            with nested_entities_lock:
+                del nested_entities[url]  # let a later caller retry
+            future.set_exception(err)
+
+    return future.result()
+
+
+def get_swapi_resource(url, params=None, cache=None, client=None):
     """ Given a url and params to search data and returns a dictionary result.
     
     Parameters:
         url (str): the url to the swapi site from where to retrieve data.
         params (dict): string of key:value pairs as search terms to search data on swapi site.
+        cache (ResponseCache): optional persistent response cache. Fresh entries are served
+            without a network round trip; stale entries are revalidated. A SwapiMirror may be
+            passed instead to answer urls and searches from a local mirror.
+        client (SwapiClient): optional pooled keep-alive client with retry/backoff, used when no
+            cache is provided.
 
     Returns:
         dict: dictionary data result gotten from the swapi site.
     """
-    response = requests.get(url, params=params).json()
-    return response
+    record = start_fetch(url, params)  # None unless swapi_stats instrumentation is enabled
+    try:
+        if cache is not None:
+            return cache.get_json(url, params)
+        if client is not None:
+            return client.get_json(url, params)
+
+        response = requests.get(url, params=params)
+        note(bytes=len(response.content))
+        return response.json()
+    finally:
+        finish_fetch(record)
 
 
 def is_unknown(value):
     """ This function is for telling if the given string equals to 'unknown' or 'n/a'.
 
     Parameters:
-        value (str): given string for testing.
+        value (str): given string for testing (other types are never unknown).
 
     Returns: 
         bool: returns True if string equals to 'unknown' or 'n/a'.
     """
-    if value.lower().strip() == 'unknown':
-        return True
-    elif value.lower().strip() == 'n/a':
-        return True
-    else:
-        return False
+    return type(value) is str and value.lower().strip() in UNKNOWN_VALUES
+
+
+def iter_collection(resource, params=None, cache=None, client=None, lookahead=PREFETCH_PAGES,
+                    endpoint=ENDPOINT):
+    """Yields every entity of a SWAPI collection (optionally narrowed by params such as
+    {'search': ...}) as the pages arrive. While the caller consumes one page, up to lookahead
+    following pages are fetched in the background; page urls are derived from the first
+    page's count, or taken from the 'next' links when there is no count. Stopping early only
+    wastes the pages already in flight.
+
+    Parameters:
+        resource (str): collection name, e.g. 'people' or 'planets'.
+        params (dict): optional dictionary of querystring arguments.
+        cache (ResponseCache): optional persistent response cache.
+        client (SwapiClient): optional pooled client, used when no cache is provided.
+        lookahead (int): maximum number of pages fetched ahead of the consumer.
+        endpoint (str): SWAPI root url.
+
+    Returns:
+        generator: entities in collection order.
+    """
+    url = f"{endpoint}/{resource}/"
+    params = dict(params or {})
+    first = get_swapi_resource(url, params or None, cache, client)
+    yield from _iter_pages(url, params, first, cache, client, lookahead)
+
+
+def _iter_pages(url, params, first, cache, client, lookahead):
+    """Yields the entities of an already fetched first collection page and of the pages after
+    it (see iter_collection)."""
+    if not first.get('next'):
+        yield from first['results']
+        return
+
+    page_size = len(first['results'])
+    count = first.get('count')
+    executor = ThreadPoolExecutor(max_workers=max(1, lookahead))
+    try:
+        if count is None or page_size == 0:
+            #no count: follow the next links, one page ahead
+            results, next_url = first['results'], first['next']
+            while next_url:
+                future = executor.submit(
+                    in_stage, current_stage(), get_swapi_resource, next_url, None, cache, client)
+                yield from results
+                page = future.result()
+                results, next_url = page['results'], page['next']
+            yield from results
+            return
+
+        pages = -(-count // page_size)
+        pending = deque()
+        next_page = 2
+        results = first['results']
+        while True:
+            while next_page <= pages and len(pending) < max(1, lookahead):
+                pending.append(executor.submit(
+                    in_stage, current_stage(), get_swapi_resource, url,
+                    dict(params, page=next_page), cache, client))
+                next_page += 1
+            yield from results
+            if not pending:
+                return
+            results = pending.popleft().result()['results']
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _matches(entity, fields, terms):
+    haystack = [str(entity.get(field, '')).lower() for field in fields]
+    return [term for term in terms if any(term in value for value in haystack)]
+
+
+def resolve_many(resource, names, filter_keys=None, cache=None, client=None,
+                 max_workers=MAX_WORKERS, endpoint=ENDPOINT):
+    """Resolves a list of names to the entities a SWAPI search for each name would return
+    first (case-insensitive substring match on the collection's search fields, in collection
+    order). The first collection page is fetched and scanned; names still unresolved are then
+    either matched by walking the remaining pages, when that takes fewer requests than one
+    search per name, or looked up with concurrent targeted searches. When the first page
+    holds the whole collection, names it does not match resolve to None without searching.
+
+    Parameters:
+        resource (str): collection name, e.g. 'people' or 'starships'.
+        names (list): names to resolve (duplicates are resolved once).
+        filter_keys (tuple): optional keys used to filter and clean the matches.
+        cache (ResponseCache): optional persistent response cache.
+        client (SwapiClient): optional pooled client, used when no cache is provided.
+        max_workers (int): maximum number of concurrent searches or cleanings.
+        endpoint (str): SWAPI root url.
+
+    Returns:
+        list: one entity per name in input order, or None where nothing matches.
+    """
+    terms = {}
+    for name in names:
+        terms.setdefault(name.lower(), name)
+    if not terms:
+        return []
+    url = f"{endpoint}/{resource}/"
+    fields = SEARCH_FIELDS.get(resource, ('name',))
+    found = {}
+
+    def scan(entities):
+        for entity in entities:
+            for term in _matches(entity, fields, [term for term in terms if term not in found]):
+                found[term] = entity
+            if len(found) == len(terms):
+                return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if len(terms) == 1:
+            first = None
+        else:
+            first = get_swapi_resource(url, None, cache, client)
+            scan(first['results'])
+        remaining = [term for term in terms if term not in found]
+
+        if first is not None and not first.get('next'):
+            remaining = []  # the first page was the whole collection
+        if remaining and first is not None:
+            page_size = len(first['results'])
+            count = first.get('count')
+            pages_left = -(-count // page_size) - 1 if count and page_size else None
+            if pages_left is not None and pages_left <= len(remaining):
+                pages = _iter_pages(url, {}, first, cache, client, PREFETCH_PAGES)
+                try:
+                    scan(pages)
+                finally:
+                    pages.close()
+                remaining = []
+
+        current = current_stage()  # workers report their fetches under the caller's stage
+        searches = [
+            (term, executor.submit(
+                in_stage, current, get_swapi_resource, url, {'search': terms[term]}, cache, client))
+            for term in remaining
+        ]
+        for term, future in searches:
+            results = future.result()['results']
+            if results:
+                found[term] = results[0]
+
+        if filter_keys is not None:
+            plan = compile_plan(filter_keys)
+            cleaned = {
+                term: executor.submit(in_stage, current, apply_plan, plan, entity, None, cache)
+                for term, entity in found.items()
+            }
+            found = {term: future.result() for term, future in cleaned.items()}
+
+    return [found.get(name.lower()) for name in names]
+
+
+def reset_nested_entities():
+    """Discards memoized nested entities and zeroes the hit/miss counters.
+
+    Parameters:
+        None
+
+    Returns:
+        None
+    """
+    with nested_entities_lock:
+        nested_entities.clear()
+        nested_entity_stats['hits'] = 0
+        nested_entity_stats['misses'] = 0
 
 
-def read_json(filepath):
+@timed
+def read_json(filepath, file_format='json'):
     """Given a valid filepath reads a JSON document and returns a dictionary.
 
     Parameters:
         filepath (str): path to file.
+        file_format (str): 'json', or 'jsonl'/'binary' for entity files written by write_json()
+            with that format (use swapi_store.EntityStore for lookups by url).
 
     Returns:
-        dict: dictionary representations of the decoded JSON document.
+        dict: dictionary representations of the decoded JSON document (a list of entities for
+        the 'jsonl' and 'binary' formats).
     """
+    if file_format != 'json':
+        with EntityStore(filepath) as store:
+            if store.file_format != file_format:
+                raise ValueError(f"{filepath} holds {store.file_format} records, not {file_format}")
+            return list(store)
+
     with open(filepath, 'r', encoding='utf8') as file_obj:
         data = json.load(file_obj)
     return data
 
 
-def write_json(filepath, data):
+def read_json_array(filepath, chunk_size=STREAM_CHUNK_SIZE):
+    """Given a valid filepath to a JSON document whose top-level value is an array, yields the
+    array's elements one at a time. Only the element being decoded (plus one chunk) is held in
+    memory, so arbitrarily large arrays can be processed in constant memory.
+
+    Parameters:
+        filepath (str): path to file.
+        chunk_size (int): number of characters read from the file at a time.
+
+    Returns:
+        generator: decoded array elements in document order.
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, 'r', encoding='utf8') as file_obj:
+        buffer = file_obj.read(chunk_size)
+        pos = WHITESPACE.match(buffer).end()
+        while pos == len(buffer) and buffer:  # leading whitespace longer than a chunk
+            buffer = file_obj.read(chunk_size)
+            pos = WHITESPACE.match(buffer).end()
+        if buffer[pos:pos + 1] != '[':
+            raise ValueError(f"{filepath} does not contain a top-level JSON array")
+        pos += 1
+        eof = False
+        expect_value = True  # an element (or the closing bracket) comes next
+        after_comma = False  # an element (not the closing bracket) must come next
+        while True:
+            pos = WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                if eof:
+                    raise ValueError(f"unterminated JSON array in {filepath}")
+                buffer = file_obj.read(chunk_size)
+                eof = not buffer
+                pos = 0
+                continue
+            if buffer[pos] == ']':
+                if after_comma:
+                    raise ValueError(f"trailing comma in JSON array in {filepath}")
+                return
+            if not expect_value:
+                if buffer[pos] != ',':
+                    raise ValueError(f"expected ',' or ']' in {filepath}")
+                pos += 1
+                expect_value = after_comma = True
+                continue
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+                complete = eof or end < len(buffer)
+                if complete and not eof and type(element) not in (dict, list):
+                    #a number cut at '.' or 'e' decodes as its prefix: accept a scalar only
+                    #once the next non-whitespace character ends it
+                    after = WHITESPACE.match(buffer, end).end()
+                    complete = after < len(buffer) and buffer[after] in ',]'
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                chunk = file_obj.read(max(chunk_size, len(buffer) - pos))
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield element
+            pos = end
+            expect_value = after_comma = False
+
+
+@timed
+def write_json(filepath, data, default=None, file_format='json'):
     """Given a valid filepath writes data to a JSON file.
 
     Parameters:
         filepath (str): the path to the file.
         data (dict): the data to be encoded as JSON and written to the file.
+        default (function): optional function returning a serializable version of objects
+            json cannot encode (e.g., swapi_records.to_json); overlays (swapi_overlay) are
+            always encoded as objects.
+        file_format (str): 'json' writes one indented document; 'jsonl' (JSON Lines) and
+            'binary' (compact records) write an iterable of entities plus a sidecar offset
+            index keyed by url (see swapi_store.write_store).
+
+    Lazy nested references (swapi_lazy) still pending are resolved concurrently before they
+    are encoded: all at once for 'json', one batch of entities at a time for the others.
 
     Returns:
         None
     """
+    default = _json_default(default)
+    if file_format != 'json':
+        write_store(filepath, resolve_batches(data), file_format, default)
+        return
+
+    if has_pending():
+        resolve_refs(data)  # fetch the pending lazy nested entities concurrently
+
+    with open(filepath, 'w', encoding='utf-8') as file_obj:
+        json.dump(data, file_obj, ensure_ascii=False, indent=2, default=default)
+
+
+def _json_default(default):
+    """Returns a json default hook that encodes overlays and lazy references (any mapping)
+    before falling back to default."""
+    if default is None:
+        return json_default
+
+    def encode(value):
+        if isinstance(value, Mapping):
+            return json_default(value)
+        return default(value)
+
+    return encode
+
+
+@timed
+def write_json_array(filepath, elements, default=None):
+    """Given a valid filepath writes an iterable of elements to a JSON file as a top-level array,
+    encoding and writing one element at a time. The file is byte-for-byte identical to the one
+    write_json() produces for a list of the same elements.
+
+    Parameters:
+        filepath (str): the path to the file.
+        elements (iterable): the elements to be encoded as JSON (e.g., a generator).
+        default (function): optional function returning a serializable version of objects
+            json cannot encode (e.g., swapi_records.to_json).
+
+    Pending lazy nested references are resolved concurrently one batch of elements at a time
+    (see swapi_lazy.resolve_batches).
+
+    Returns:
+        int: number of elements written.
+    """
+    count = 0
+    default = _json_default(default)
     with open(filepath, 'w', encoding='utf-8') as file_obj:
-        json.dump(data, file_obj, ensure_ascii=False, indent=2)
+        for element in resolve_batches(elements):
+            file_obj.write(',\n  ' if count else '[\n  ')
+            text = json.dumps(element, ensure_ascii=False, indent=2, default=default)
+            file_obj.write(text.replace('\n', '\n  '))
+            count += 1
+        file_obj.write('\n]' if count else '[]')
+    return count
 
 
-def main():
+def main(offline=False, max_workers=MAX_WORKERS, mirror_file=None, columnar=False,
+         workers=None, incremental=False, client=None, stats=False, trace_file=None):
     """ Write enriched data to new file.
 
     Parameters:
-        None
+        offline (bool): serve SWAPI resources from the response cache only.
+        max_workers (int): maximum number of SWAPI lookups in flight at once.
+        mirror_file (str): optional path to a mirror written by swapi_mirror.mirror_swapi();
+            when provided every lookup is answered locally and the network is not used.
+        columnar (bool): filter and clean the planet list with the NumPy columnar path
+            (swapi_columnar) instead of one dictionary at a time.
+        workers (int): clean the planet list on this many worker processes
+            (swapi_parallel); None cleans it in this process.
+        incremental (bool): reuse the enrichment results of the previous run for the Echo Base
+            sections whose inputs did not change (state kept next to the output file).
+        client (SwapiClient): optional HTTP client for cache misses (e.g., one routed to a
+            swapi_standin server); a new SwapiClient is created if not provided.
+        stats (bool): record every SWAPI fetch and timed call (swapi_stats) and print a summary
+            and the per-node timings of the Echo Base enrichment (swapi_dag.format_timings)
+            at the end of the run.
+        trace_file (str): optional path of a JSON trace of the recorded calls (implies stats).
     Returns:
         None
     """
+    recorder = swapi_stats.enable() if stats or trace_file else None
+
+    if mirror_file:
+        cache = SwapiMirror(mirror_file)
+    else:
+        cache = ResponseCache(CACHE_FILE, offline=offline, client=client or SwapiClient())
+    reset_nested_entities()
 
     #swapi_planets_uninhabited json file
-    uninhabited = []
     file_in = 'swapi_planets-v1p0.json'
     file_out = 'swapi_planets_uninhabited-v1p1.json'
 
-    planet_dicts = read_json(file_in)
-    for d in planet_dicts:
-        if is_unknown(d['population']):
-            filtered = filter_data(d, PLANET_KEYS)
-            cleaned = clean_data(filtered)
-            uninhabited.append(cleaned)
+    with stage('planets'):
+        if columnar:
+            from swapi_columnar import uninhabited_planets  # numpy is only needed on this path
+            uninhabited = uninhabited_planets(read_json(file_in))
+        elif workers:
+            from swapi_parallel import iter_clean_parallel
+            uninhabited = iter_clean_parallel(
+                (d for d in read_json_array(file_in) if is_unknown(d['population'])), PLANET_KEYS,
+                workers, cache=cache)
+        else:
+            #stream the planets through the filter in constant memory
+            planet_plan = compile_plan(PLANET_KEYS)
+            uninhabited = (
+                apply_plan(planet_plan, d, None, cache)
+                for d in read_json_array(file_in) if is_unknown(d['population'])
+            )
 
-    write_json(file_out, uninhabited)
+        write_json_array(file_out, uninhabited)
 
     #Enrich echo base data
     f_in = 'swapi_echo_base-v1p0.json'
     f_out = 'swapi_echo_base-v1p1.json'
 
-    #hoth data
     echo_base = read_json(f_in)
-    swapi_planets_url = f"{ENDPOINT}/planets/"
-
-    swapi_hoth = get_swapi_resource(
-        swapi_planets_url, {'search': 'Hoth'})['results'][0]
-    echo_base_hoth = echo_base['location']['planet']
-    hoth = combine_data(echo_base_hoth, swapi_hoth)
-    hoth = filter_data(hoth, HOTH_KEYS)
-    hoth = clean_data(hoth)
-    echo_base['location']['planet'] = hoth
-
-    #commander data
-    echo_base_commander = echo_base['garrison']['commander']
-    echo_base_commander = clean_data(echo_base_commander)
-    echo_base['garrison']['commander'] = echo_base_commander
-
-    #enrich dash rendar
-    echo_base_dash = echo_base['visiting_starships']['freighters'][1]['pilot']
-    echo_base_dash = clean_data(echo_base_dash)
-    echo_base['visiting_starships']['freighters'][1]['pilot'] = echo_base_dash
-
-    #enrich snowspeeder data
-    swapi_vehicles_url = f"{ENDPOINT}/vehicles/"
-    swapi_snowspeeder = get_swapi_resource(
-        swapi_vehicles_url, {'search': 'snowspeeder'})['results'][0]
-
-    echo_base_snowspeeder = echo_base['vehicle_assets']['snowspeeders'][0]['type']
-
-    snowspeeder = combine_data(echo_base_snowspeeder, swapi_snowspeeder)
-    snowspeeder = filter_data(snowspeeder, VEHICLE_KEYS)
-    snowspeeder = clean_data(snowspeeder)
-    echo_base['vehicle_assets']['snowspeeders'][0]['type'] = snowspeeder
-
-    #enrich t-65 x-wing
-    swapi_starship_url = f"{ENDPOINT}/starships/"
-    swapi_xwing = get_swapi_resource(
-        swapi_starship_url, {'search': 'T-65 X-wing'})['results'][0]
-
-    echo_base_xwing = echo_base['starship_assets']['starfighters'][0]['type']
-
-    xwing = combine_data(echo_base_xwing, swapi_xwing)
-    xwing = filter_data(xwing, STARSHIP_KEYS)
-    xwing = clean_data(xwing)
-    echo_base['starship_assets']['starfighters'][0]['type'] = xwing
-
-    #enrich GR-75 medium transport
-    swapi_gr75 = get_swapi_resource(
-        swapi_starship_url, {'search': 'GR-75 medium transport'})['results'][0]
-
-    echo_base_gr75 = echo_base['starship_assets']['transports'][0]['type']
-
-    gr_75 = combine_data(echo_base_gr75, swapi_gr75)
-    gr_75 = filter_data(gr_75, STARSHIP_KEYS)
-    gr_75 = clean_data(gr_75)
-    echo_base['starship_assets']['transports'][0]['type'] = gr_75
-
-    #enrich Millennium Falcon
-    swapi_falcon = get_swapi_resource(
-        swapi_starship_url, {'search': 'Millennium Falcon'})['results'][0]
-    echo_base_falcon = echo_base['visiting_starships']['freighters'][0]
-
-    m_falcon = combine_data(echo_base_falcon, swapi_falcon)
-    m_falcon = filter_data(m_falcon, STARSHIP_KEYS)
-    m_falcon = clean_data(m_falcon)
-    echo_base['visiting_starships']['freighters'][0] = m_falcon
-
-    #Assign crew to the Millennium Falcon
-
-    #retrieve han
-    swapi_people_url = f"{ENDPOINT}/people/"
-    han = get_swapi_resource(swapi_people_url, {'search': 'han solo'})[
-        'results'][0]
-    han = filter_data(han, PEOPLE_KEYS)
-    han = clean_data(han)
-
-    #retrieve Chewbacca
-    chewie = get_swapi_resource(swapi_people_url, {'search': 'Chewbacca'})[
-        'results'][0]
-    chewie = filter_data(chewie, PEOPLE_KEYS)
-    chewie = clean_data(chewie)
-
-    #assign han and chewbacca
-    m_falcon = assign_crew(m_falcon, {'pilot': han, 'copilot': chewie})
-    echo_base['visiting_starships']['freighters'][0] = m_falcon
+
+    #run the declarative enrichment steps; independent lookups run concurrently
+    from swapi_dag import ECHO_BASE_SPEC, enrich_document, format_timings  # imports this module
+    with stage('echo_base'):
+        if incremental:
+            from swapi_dag import load_state, save_state
+            state_file = 'swapi_echo_base-v1p1.state.json'
+            state = load_state(state_file)
+            results, timings = enrich_document(
+                echo_base, ECHO_BASE_SPEC, cache, max_workers, state=state)
+            save_state(state_file, state)
+        else:
+            results, timings = enrich_document(echo_base, ECHO_BASE_SPEC, cache, max_workers)
 
     #Update evacuation plan
     evac_plan = echo_base['evacuation_plan']
@@ -372,33 +889,22 @@ def main():
     for v_number in echo_base['garrison']['personnel'].values():
         evac_plan['max_base_personnel'] += v_number
 
-    trans_num = echo_base['starship_assets']['transports'][0]['num_available']
+    transports = echo_base['starship_assets']['transports']
     evac_plan['max_available_transports'] = 0
-    evac_plan['max_available_transports'] += trans_num
+    for asset in transports:
+        evac_plan['max_available_transports'] += asset['num_available']
 
-    pass_num = 90
-    total_trans_pass = trans_num * pass_num
-    evac_plan['max_passenger_overload_capacity'] = 0
-    evac_plan['max_passenger_overload_capacity'] = total_trans_pass * \
-        evac_plan['passenger_overload_multiplier']
+    evac_plan['max_passenger_overload_capacity'] = lift_capacity(
+        transports, evac_plan['passenger_overload_multiplier'])
 
     #bright hope assignment
-    evac_transport = echo_base['starship_assets']['transports'][0]['type'].copy(
-    )
+    evac_transport = derive(echo_base['starship_assets']['transports'][0]['type'])
     evac_transport['name'] = 'Bright Hope'
     evac_transport['passenger_manifest'] = []
 
-    #retrieve leia organa
-    leia_o = get_swapi_resource(swapi_people_url, {'search': 'Leia Organa'})[
-        'results'][0]
-    leia_o = filter_data(leia_o, PEOPLE_KEYS)
-    leia_o = clean_data(leia_o)
-
-    #retrieve C-3PO
-    c_3po = get_swapi_resource(
-        swapi_people_url, {'search': 'C-3PO'})['results'][0]
-    c_3po = filter_data(c_3po, PEOPLE_KEYS)
-    c_3po = clean_data(c_3po)
+    #retrieve leia organa and C-3PO
+    leia_o = results['leia_organa']
+    c_3po = results['c_3po']
 
     #assign the two passengers
     evac_transport['passenger_manifest'].append(leia_o)
@@ -407,29 +913,17 @@ def main():
     #assign escorts
     evac_transport['escorts'] = []
     xwing_copy = echo_base['starship_assets']['starfighters'][0]['type']
-    luke_x_wing = xwing_copy.copy()
-    wedge_x_wing = xwing_copy.copy()
-
-    luke = get_swapi_resource(swapi_people_url, {'search': 'Luke Skywalker'})[
-        'results'][0]
-    luke = filter_data(luke, PEOPLE_KEYS)
-    luke = clean_data(luke)
-    r2_d2 = get_swapi_resource(
-        swapi_people_url, {'search': 'R2-D2'})['results'][0]
-    r2_d2 = filter_data(r2_d2, PEOPLE_KEYS)
-    r2_d2 = clean_data(r2_d2)
+    luke_x_wing = derive(xwing_copy)
+    wedge_x_wing = derive(xwing_copy)
+
+    luke = results['luke_skywalker']
+    r2_d2 = results['r2_d2']
     luke_x_wing = assign_crew(
         luke_x_wing, {'pilot': luke, 'astromech_droid': r2_d2})
     evac_transport['escorts'].append(luke_x_wing)
 
-    wedge = get_swapi_resource(swapi_people_url, {'search': 'Wedge Antilles'})[
-        'results'][0]
-    wedge = filter_data(wedge, PEOPLE_KEYS)
-    wedge = clean_data(wedge)
-    r5_d4 = get_swapi_resource(
-        swapi_people_url, {'search': 'R5-D4'})['results'][0]
-    r5_d4 = filter_data(r5_d4, PEOPLE_KEYS)
-    r5_d4 = clean_data(r5_d4)
+    wedge = results['wedge_antilles']
+    r5_d4 = results['r5_d4']
     wedge_x_wing = assign_crew(
         wedge_x_wing, {'pilot': wedge, 'astromech_droid': r5_d4})
     evac_transport['escorts'].append(wedge_x_wing)
@@ -439,6 +933,15 @@ def main():
 
     #write into output file
     write_json(f_out, echo_base)
+    if not mirror_file:
+        cache.close()  # writes the batched cache access times
+
+    if recorder is not None:
+        swapi_stats.disable()
+        print(recorder.format_summary())
+        print(format_timings(timings))
+        if trace_file:
+            recorder.write_trace(trace_file)
 
 
 if __name__ == '__main__':
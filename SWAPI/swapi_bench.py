@@ -0,0 +1,264 @@
+import random
+import sys
+import timeit
+import tracemalloc
+
+from swapi_assignment import (
+    PLANET_KEYS, clean_data, clean_many, combine_data, compile_plan, filter_data, is_unknown,
+    read_json
+)
+
+PLANETS_FILE = 'swapi_planets-v1p0.json'
+
+
+def load_planets(count, filepath=PLANETS_FILE):
+    """Returns count planet dictionaries by repeating the planets in a local JSON file.
+
+    Parameters:
+        count (int): number of planets to return.
+        filepath (str): path to a JSON list of SWAPI planets.
+
+    Returns:
+        list: planet dictionaries.
+    """
+    planets = read_json(filepath)
+    return [planets[i % len(planets)] for i in range(count)]
+
+
+def best_of(func, repeat=5):
+    """Returns the fastest of several timed calls of a function.
+
+    Parameters:
+        func (function): callable taking no arguments.
+        repeat (int): number of timed calls.
+
+    Returns:
+        float: fastest wall-clock time in seconds.
+    """
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def bench_cleaning(count=100000):
+    """Compares per-entity cleaning cost of the filter_data -> combine_data -> clean_data chain
+    with a compiled plan applied through clean_many().
+
+    Parameters:
+        count (int): number of planets to clean.
+
+    Returns:
+        dict: seconds per run and microseconds per entity for each path.
+    """
+    planets = load_planets(count)
+    plan = compile_plan(PLANET_KEYS)
+
+    def chained():
+        return [clean_data(filter_data(combine_data({}, p), PLANET_KEYS)) for p in planets]
+
+    def planned():
+        return clean_many(planets, plan)
+
+    assert chained() == planned()
+    results = {}
+    for name, func in (('chained', chained), ('clean_many', planned)):
+        seconds = best_of(func)
+        results[name] = {'seconds': seconds, 'us_per_entity': seconds / count * 1e6}
+    return results
+
+
+def bench_uninhabited(count=1000000):
+    """Compares the per-dictionary uninhabited planet filter with the NumPy columnar path.
+
+    Parameters:
+        count (int): number of planets to filter.
+
+    Returns:
+        dict: seconds per run and microseconds per input planet for each path.
+    """
+    from swapi_columnar import uninhabited_planets  # requires numpy
+
+    planets = load_planets(count)
+    plan = compile_plan(PLANET_KEYS)
+
+    def per_dict():
+        return clean_many((p for p in planets if is_unknown(p['population'])), plan)
+
+    def columnar():
+        return uninhabited_planets(planets)
+
+    assert per_dict() == columnar()
+    results = {}
+    for name, func in (('per_dict', per_dict), ('columnar', columnar)):
+        seconds = best_of(func, repeat=3)
+        results[name] = {'seconds': seconds, 'us_per_entity': seconds / count * 1e6}
+    return results
+
+
+def bench_parallel(count=200000, worker_counts=(1, 2, 4, 8)):
+    """Measures how process-pool cleaning (swapi_parallel) scales with the number of workers,
+    against clean_many() in a single process.
+
+    Parameters:
+        count (int): number of planets to clean.
+        worker_counts (tuple): worker counts to measure.
+
+    Returns:
+        dict: seconds per run, microseconds per entity and speedup over clean_many per setting.
+    """
+    from swapi_parallel import clean_parallel
+
+    planets = load_planets(count)
+    plan = compile_plan(PLANET_KEYS)
+    expected = clean_many(planets, plan)
+    baseline = best_of(lambda: clean_many(planets, plan), repeat=3)
+    results = {'clean_many': {'seconds': baseline, 'us_per_entity': baseline / count * 1e6}}
+    for workers in worker_counts:
+        assert clean_parallel(planets, PLANET_KEYS, workers) == expected
+        seconds = best_of(lambda: clean_parallel(planets, PLANET_KEYS, workers), repeat=3)
+        results[f"workers={workers}"] = {
+            'seconds': seconds, 'us_per_entity': seconds / count * 1e6,
+            'speedup': baseline / seconds,
+        }
+    return results
+
+
+def allocated_bytes(func):
+    """Returns the result of a call and the number of bytes it left allocated.
+
+    Parameters:
+        func (function): callable taking no arguments.
+
+    Returns:
+        tuple: (result, bytes still allocated after the call).
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def bench_records(count=100000):
+    """Compares the memory held per cleaned planet by a plain dictionary and by a slotted
+    record (swapi_records). Field values are shared by both representations, so the figures
+    are the per-entity container overhead.
+
+    Parameters:
+        count (int): number of planets to hold.
+
+    Returns:
+        dict: bytes per entity for each representation.
+    """
+    from swapi_records import Record, to_records
+
+    cleaned = clean_many(load_planets(count), compile_plan(PLANET_KEYS))
+    dicts, dict_bytes = allocated_bytes(lambda: [dict(planet) for planet in cleaned])
+    records, record_bytes = allocated_bytes(lambda: to_records(cleaned, PLANET_KEYS, {}))
+    assert [record.to_dict() for record in records] == dicts
+    assert isinstance(records[0], Record)
+    return {
+        'dict': {'bytes_per_entity': dict_bytes / count},
+        'record': {'bytes_per_entity': record_bytes / count, 'saving': 1 - record_bytes / dict_bytes},
+    }
+
+
+def bench_overlays(count=100000):
+    """Compares the memory held per derived starship by a dict copy of a shared type record
+    plus crew (the evacuation plan's escorts) and by a copy-on-write overlay (swapi_overlay).
+
+    Parameters:
+        count (int): number of derived starships to hold.
+
+    Returns:
+        dict: bytes per entity for each representation.
+    """
+    from swapi_overlay import derive
+
+    starship_type = clean_many(load_planets(1), compile_plan(PLANET_KEYS))[0]
+    crew = {'pilot': {'name': 'Luke Skywalker'}, 'astromech_droid': {'name': 'R2-D2'}}
+    copies, copy_bytes = allocated_bytes(
+        lambda: [dict(starship_type.copy(), **crew) for _ in range(count)])
+    overlays, overlay_bytes = allocated_bytes(
+        lambda: [derive(starship_type, crew) for _ in range(count)])
+    assert overlays[0] == copies[0]
+    return {
+        'dict copy': {'bytes_per_entity': copy_bytes / count},
+        'overlay': {'bytes_per_entity': overlay_bytes / count,
+                    'saving': 1 - overlay_bytes / copy_bytes},
+    }
+
+
+def synthetic_garrison(personnel, seed=0):
+    """Returns a synthetic garrison roster and fleet for the evacuation benchmark: units of 1
+    to 60 personnel adding up to the head count, two transport types and enough starfighters
+    to escort half of the transports.
+
+    Parameters:
+        personnel (int): total head count.
+        seed (int): random seed.
+
+    Returns:
+        tuple: (units as (label, size) pairs, transport assets, starfighter assets).
+    """
+    rng = random.Random(seed)
+    units = []
+    while personnel > 0:
+        size = min(personnel, rng.randint(1, 60))
+        units.append((f"unit-{len(units)}", size))
+        personnel -= size
+    transports = [
+        {'type': {'name': 'GR-75 medium transport', 'passengers': 90}, 'num_available': 300},
+        {'type': {'name': 'Action VI transport', 'passengers': 240}, 'num_available': 100},
+    ]
+    starfighters = [{'type': {'name': 'X-wing'}, 'num_available': 400}]
+    return units, transports, starfighters
+
+
+def bench_evacuation(count=300000):
+    """Times the evacuation planner (swapi_evac) on a synthetic garrison and checks that the
+    plan is feasible.
+
+    Parameters:
+        count (int): number of personnel to evacuate.
+
+    Returns:
+        dict: seconds per run and microseconds per evacuee, with the transports used and the
+        lower bound on transports for the fleet.
+    """
+    from swapi_evac import check_plan, plan_evacuation
+
+    units, transports, starfighters = synthetic_garrison(count)
+    seconds = best_of(lambda: plan_evacuation(units, transports, 3, starfighters))
+    plan = plan_evacuation(units, transports, 3, starfighters)
+    assert not check_plan(plan, units, 3)
+    per_lift = plan['transports_per_lift']
+    lifts, remainder = divmod(count, plan['capacity_per_lift'])
+    lower_bound = lifts * per_lift
+    for capacity in sorted((t['type']['passengers'] * 3 for t in transports
+                            for _ in range(t['num_available'])), reverse=True)[:per_lift]:
+        if remainder <= 0:
+            break
+        remainder -= capacity
+        lower_bound += 1
+    return {'evacuation': {
+        'seconds': seconds, 'us_per_entity': seconds / count * 1e6,
+        'transports_used': plan['transports_used'], 'lower_bound': lower_bound,
+    }}
+
+
+def main():
+    """Runs the benchmarks and prints the results."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for bench in (bench_cleaning, bench_uninhabited, bench_parallel, bench_evacuation):
+        for name, result in bench(count).items():
+            speedup = f"  x{result['speedup']:.2f}" if 'speedup' in result else ''
+            print(f"{name:>12}: {result['seconds']:.3f}s  {result['us_per_entity']:.2f} us/entity"
+                  f"{speedup}")
+    for name, result in {**bench_records(count), **bench_overlays(count)}.items():
+        saving = f"  -{result['saving']:.0%}" if 'saving' in result else ''
+        print(f"{name:>12}: {result['bytes_per_entity']:.0f} bytes/entity{saving}")
+
+
+if __name__ == '__main__':
+    main()
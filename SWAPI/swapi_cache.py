@@ -0,0 +1,237 @@
+import json
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from swapi_stats import note
+
+CACHE_FILE = 'swapi_cache.sqlite'
+CACHE_TTL = 24 * 60 * 60  # seconds
+CACHE_MAX_ENTRIES = 10000
+ACCESS_FLUSH_EVERY = 256  # cache hits whose LRU access times are written in one batch
+
+
+class CacheMiss(LookupError):
+    """Raised in offline mode when a requested resource is not in the cache."""
+
+
+def cache_key(url, params=None):
+    """Returns the canonical cache key for a url and optional querystring arguments. The scheme
+    and host are lower-cased and querystring arguments embedded in the url are merged with the
+    params and sorted so that equivalent requests share one cache entry.
+
+    Parameters:
+        url (str): a url that specifies the resource.
+        params (dict): optional dictionary of querystring arguments.
+
+    Returns:
+        str: canonical key.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(key), str(value)) for key, value in params.items())
+    return urlunsplit((
+        parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', urlencode(sorted(query)), ''
+    ))
+
+
+class ResponseCache:
+    """Persistent SQLite-backed cache of decoded SWAPI responses.
+
+    Entries younger than the ttl are served without touching the network. Stale entries are
+    revalidated with the stored ETag/Last-Modified validators; a 304 response refreshes the entry
+    in place. When the cache holds more than max_entries the least recently used entries are
+    evicted. In offline mode only cached entries are served (stale or not) and a miss raises
+    CacheMiss. Hits are read-only: their access times are kept in memory and written in
+    batches (every ACCESS_FLUSH_EVERY hits, before an eviction and on close()).
+
+    Parameters:
+        filepath (str): path to the SQLite database file (':memory:' for a throwaway cache).
+        ttl (int): seconds an entry is considered fresh.
+        max_entries (int): maximum number of entries kept before LRU eviction.
+        offline (bool): serve from the cache only.
+        client (SwapiClient): optional pooled HTTP client used for cache misses and
+            revalidation (defaults to bare requests.get).
+
+    Callables appended to listeners are invoked as listener(url, data) after every store (e.g.,
+    to keep a search index up to date).
+    """
+
+    def __init__(self, filepath=CACHE_FILE, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES,
+                 offline=False, client=None):
+        self.filepath = filepath
+        self.client = client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.offline = offline
+        self.listeners = []
+        self._accessed = {}  # key -> access time not yet written to the database
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(filepath, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, body TEXT NOT NULL, etag TEXT, last_modified TEXT, '
+            'stored_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)'
+        )
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def close(self):
+        """Writes pending access times and closes the underlying database connection."""
+        with self._lock:
+            self._flush_accessed()
+            self._conn.commit()
+            self._conn.close()
+
+    def _flush_accessed(self):
+        """Writes the batched access times (caller holds the lock and commits)."""
+        if self._accessed:
+            self._conn.executemany(
+                'UPDATE responses SET accessed_at = ? WHERE key = ?',
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    def clear(self):
+        """Removes every cached entry."""
+        with self._lock:
+            self._accessed.clear()
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def documents(self):
+        """Returns every cached document.
+
+        Parameters:
+            None
+
+        Returns:
+            list: decoded JSON documents in no particular order.
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT body FROM responses').fetchall()
+        return [json.loads(body) for body, in rows]
+
+    def lookup(self, url, params=None):
+        """Returns the cached entry for a request regardless of its age.
+
+        Parameters:
+            url (str): a url that specifies the resource.
+            params (dict): optional dictionary of querystring arguments.
+
+        Returns:
+            tuple: (data, etag, last_modified, stored_at) or None if the request is not cached.
+        """
+        key = cache_key(url, params)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = time.time()
+            if len(self._accessed) >= ACCESS_FLUSH_EVERY:
+                self._flush_accessed()
+                self._conn.commit()
+        return json.loads(row[0]), row[1], row[2], row[3]
+
+    def store(self, url, params, data, etag=None, last_modified=None):
+        """Writes a decoded response to the cache, evicting least recently used entries if the
+        size cap is exceeded.
+
+        Parameters:
+            url (str): a url that specifies the resource.
+            params (dict): optional dictionary of querystring arguments.
+            data (dict): decoded JSON document.
+            etag (str): optional ETag validator returned by the server.
+            last_modified (str): optional Last-Modified validator returned by the server.
+
+        Returns:
+            None
+        """
+        key = cache_key(url, params)
+        now = time.time()
+        body = json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            self._flush_accessed()  # so eviction sees the latest access times
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(key, body, etag, last_modified, stored_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, body, etag, last_modified, now, now)
+            )
+            self._conn.execute(
+                'DELETE FROM responses WHERE key IN ('
+                'SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+            self._conn.commit()
+        for listener in self.listeners:
+            listener(url, data)
+
+    def _touch(self, url, params):
+        with self._lock:
+            self._conn.execute(
+                'UPDATE responses SET stored_at = ? WHERE key = ?',
+                (time.time(), cache_key(url, params))
+            )
+            self._conn.commit()
+
+    def get_json(self, url, params=None):
+        """Returns the decoded JSON document for a request, consulting the cache first.
+
+        Parameters:
+            url (str): a url that specifies the resource.
+            params (dict): optional dictionary of querystring arguments.
+
+        Returns:
+            dict: decoded JSON document expressed as dictionary.
+        """
+        entry = self.lookup(url, params)
+        if entry is not None:
+            data, etag, last_modified, stored_at = entry
+            fresh = time.time() - stored_at < self.ttl
+            if fresh or self.offline:
+                note(cache='hit' if fresh else 'stale')
+                return data
+        elif self.offline:
+            raise CacheMiss(cache_key(url, params))
+
+        headers = {}
+        if entry is not None:
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        if self.client is not None:
+            response = self.client.get(url, params=params, headers=headers)
+        else:
+            response = requests.get(url, params=params, headers=headers)
+            note(bytes=len(response.content))
+        if response.status_code == 304 and entry is not None:
+            self._touch(url, params)
+            note(cache='revalidated')
+            return data
+
+        note(cache='miss')
+
+        data = response.json()
+        if response.status_code == 200:
+            self.store(
+                url, params, data,
+                response.headers.get('ETag'), response.headers.get('Last-Modified')
+            )
+        return data
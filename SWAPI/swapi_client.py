@@ -0,0 +1,182 @@
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from swapi_stats import note
+
+POOL_CONNECTIONS = 4  # number of hosts to keep pools for
+POOL_MAXSIZE = 16  # keep-alive connections per host
+TIMEOUT = (3.05, 30)  # (connect, read) seconds
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_MAX = 30  # seconds
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Returns a jittered exponential backoff delay ("full jitter": a uniform draw between zero
+    and the capped exponential delay) for a retry attempt.
+
+    Parameters:
+        attempt (int): zero-based retry attempt.
+        base (float): delay of the first attempt in seconds.
+        cap (float): maximum delay in seconds.
+
+    Returns:
+        float: seconds to sleep before retrying.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_delay(response):
+    """Returns the delay requested by a Retry-After header given in seconds, or None.
+
+    Parameters:
+        response (requests.Response): response that may carry a Retry-After header.
+
+    Returns:
+        float: seconds to wait, or None if the header is absent or not a number.
+    """
+    try:
+        return float(response.headers['Retry-After'])
+    except (KeyError, ValueError):
+        return None
+
+
+def _counting_pool_class(pool_class, on_connect):
+    """Returns a subclass of a urllib3 connection pool class that calls on_connect whenever the
+    pool opens a new connection."""
+
+    class CountingPool(pool_class):
+        def _new_conn(self):
+            on_connect()
+            return super()._new_conn()
+
+    return CountingPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report every new connection to a callback."""
+
+    def __init__(self, on_connect, **kwargs):
+        self._on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _counting_pool_class(pool_class, self._on_connect)
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+
+class SwapiClient:
+    """Shared HTTP client for SWAPI. Requests go through one pooled keep-alive session so the TCP
+    connection and TLS handshake are reused across calls and threads. 429 and 5xx responses and
+    connection errors are retried with jittered exponential backoff (a Retry-After header takes
+    precedence). Connection, request and retry counts are kept in metrics.
+
+    Parameters:
+        pool_connections (int): number of per-host connection pools to cache.
+        pool_maxsize (int): maximum keep-alive connections per host.
+        timeout (float | tuple): requests timeout, in seconds.
+        max_retries (int): maximum retries per request.
+        backoff_base (float): delay of the first retry in seconds.
+        backoff_max (float): maximum delay between retries in seconds.
+    """
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                 timeout=TIMEOUT, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE,
+                 backoff_max=BACKOFF_MAX):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.metrics = {'connections_opened': 0, 'requests': 0, 'retries': 0}
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = _CountingAdapter(
+            self._count_connection, pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _count(self, metric):
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def _count_connection(self):
+        self._count('connections_opened')
+
+    def close(self):
+        """Closes the pooled connections."""
+        self.session.close()
+
+    def requests_per_connection(self):
+        """Returns the average number of requests (including retries) served per connection.
+
+        Parameters:
+            None
+
+        Returns:
+            float: requests per opened connection (0.0 before the first connection).
+        """
+        with self._lock:
+            opened = self.metrics['connections_opened']
+            return self.metrics['requests'] / opened if opened else 0.0
+
+    def get(self, url, params=None, headers=None):
+        """Issues an HTTP GET request, retrying 429/5xx responses and connection errors.
+
+        Parameters:
+            url (str): a url that specifies the resource.
+            params (dict): optional dictionary of querystring arguments.
+            headers (dict): optional request headers.
+
+        Returns:
+            requests.Response: the final response (which may still be an error status once
+            retries are exhausted).
+        """
+        attempt = 0
+        while True:
+            self._count('requests')
+            try:
+                response = self.session.get(
+                    url, params=params, headers=headers, timeout=self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+            else:
+                note(bytes=len(response.content))
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = retry_after_delay(response)
+                if delay is None:
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                response.close()
+            self._count('retries')
+            attempt += 1
+            time.sleep(delay)
+
+    def get_json(self, url, params=None):
+        """Issues an HTTP GET request and returns the decoded JSON document.
+
+        Parameters:
+            url (str): a url that specifies the resource.
+            params (dict): optional dictionary of querystring arguments.
+
+        Returns:
+            dict: decoded JSON document expressed as dictionary.
+        """
+        return self.get(url, params).json()
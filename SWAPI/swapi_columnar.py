@@ -0,0 +1,154 @@
+from operator import itemgetter
+
+import numpy as np
+
+from swapi_assignment import FLOAT_PROPS, INT_PROPS, LIST_PROPS, PLANET_KEYS, compile_plan
+
+INT64 = np.iinfo(np.int64)
+
+
+def _extract(planets, key):
+    """Returns the values of one key across all planets and a mask of the planets that have it."""
+    try:
+        return list(map(itemgetter(key), planets)), np.ones(len(planets), dtype=bool)
+    except KeyError:
+        present = np.fromiter((key in p for p in planets), dtype=bool, count=len(planets))
+        return [p.get(key, '') for p in planets], present
+
+
+def _encode(values):
+    """Dictionary-encodes a list of hashable values.
+
+    Parameters:
+        values (list): raw column values.
+
+    Returns:
+        tuple: (int64 array of codes, list of distinct values in first-seen order).
+    """
+    index = {}
+    codes = np.fromiter(
+        (index.setdefault(value, len(index)) for value in values), dtype=np.int64, count=len(values)
+    )
+    return codes, list(index)
+
+
+def _is_number(value, number_type):
+    """Returns True if a cleaned value fits the numeric array of its column (ints beyond
+    int64, e.g. int('1' * 30), do not)."""
+    if type(value) != number_type:
+        return False
+    return number_type is not int or INT64.min <= value <= INT64.max
+
+
+def load_planet_columns(planets, keys=PLANET_KEYS):
+    """Loads a list of SWAPI planet dictionaries into typed columns. Every column is
+    dictionary-encoded and each distinct value is cleaned once with the converter clean_data()
+    would use, so conversion cost scales with the number of distinct values rather than rows.
+    Integer properties become int64 arrays and gravity a float64 array, each with a mask of
+    unknown entries and a mask of entries that could not be converted or do not fit int64 (kept
+    verbatim in the lookup, as clean_data returns them); climate and terrain keep their codes
+    as categorical codes.
+
+    Parameters:
+        planets (list): planet dictionaries as read from SWAPI or a local JSON file.
+        keys (tuple): planet keys to load (order is preserved on output).
+
+    Returns:
+        dict: key -> column dict with 'kind', 'codes', 'lookup' (cleaned distinct values) and
+        'present'; numeric columns also carry 'values', 'unknown' and 'invalid' arrays.
+    """
+    converters = dict(compile_plan(keys))
+    columns = {}
+    for key in keys:
+        raw, present = _extract(planets, key)
+        codes, distinct = _encode(raw)
+        lookup = [converters[key](value, None) for value in distinct]
+        column = {'present': present, 'codes': codes, 'lookup': lookup}
+
+        if key in INT_PROPS or key in FLOAT_PROPS:
+            number_type = int if key in INT_PROPS else float
+            column['kind'] = number_type.__name__
+            column['values'] = np.array(
+                [value if _is_number(value, number_type) else 0 for value in lookup],
+                dtype=np.int64 if key in INT_PROPS else np.float64
+            )[codes]
+            column['unknown'] = np.array([value is None for value in lookup], dtype=bool)[codes]
+            column['unknown'] &= present
+            column['invalid'] = np.array(
+                [value is not None and not _is_number(value, number_type) for value in lookup],
+                dtype=bool
+            )[codes]
+        elif key in LIST_PROPS:
+            column['kind'] = 'category'
+        else:
+            column['kind'] = 'object'
+        columns[key] = column
+    return columns
+
+
+def uninhabited_mask(columns):
+    """Returns a boolean mask of the planets whose population is unknown.
+
+    Parameters:
+        columns (dict): columns returned by load_planet_columns().
+
+    Returns:
+        numpy.ndarray: boolean mask of selected rows.
+    """
+    return columns['population']['unknown']
+
+
+def emit_rows(columns, mask, keys=PLANET_KEYS):
+    """Materializes cleaned planet dictionaries for the selected rows only. The output matches
+    what clean_data(filter_data(planet, keys)) returns for each selected planet.
+
+    Parameters:
+        columns (dict): columns returned by load_planet_columns().
+        mask (numpy.ndarray): boolean mask of rows to emit.
+        keys (tuple): planet keys to emit, in order.
+
+    Returns:
+        list: cleaned planet dictionaries.
+    """
+    rows = np.flatnonzero(mask)
+    selected = []
+    for key in keys:
+        column = columns[key]
+        lookup = column['lookup']
+        codes = column['codes'][rows].tolist()
+        if column['kind'] == 'category':
+            values = [None if lookup[code] is None else list(lookup[code]) for code in codes]
+        else:
+            values = [lookup[code] for code in codes]
+        selected.append((key, values, column['present'][rows]))
+
+    if all(present.all() for key, values, present in selected):
+        names = [key for key, values, present in selected]
+        return [dict(zip(names, row)) for row in zip(*(values for key, values, present in selected))]
+
+    entities = []
+    selected = [(key, values, present.tolist()) for key, values, present in selected]
+    for i in range(len(rows)):
+        entity = {}
+        for key, values, present in selected:
+            if present[i]:
+                entity[key] = values[i]
+        entities.append(entity)
+    return entities
+
+
+def uninhabited_planets(planets):
+    """Returns the cleaned uninhabited planets of a planet list using the columnar path. Only the
+    population column is loaded for the whole list; the remaining columns are loaded for the
+    selected planets only.
+
+    Parameters:
+        planets (list): planet dictionaries.
+
+    Returns:
+        list: cleaned planet dictionaries whose population is unknown.
+    """
+    population = load_planet_columns(planets, ('population',))
+    selected = [planets[row] for row in np.flatnonzero(uninhabited_mask(population)).tolist()]
+    columns = load_planet_columns(selected)
+    return emit_rows(columns, np.ones(len(selected), dtype=bool))
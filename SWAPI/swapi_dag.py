@@ -0,0 +1,355 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from swapi_assignment import (
+    DICT_PROPS, ENDPOINT, HOTH_KEYS, MAX_WORKERS, PEOPLE_KEYS, STARSHIP_KEYS, VEHICLE_KEYS,
+    apply_plan, assign_crew, clean_data, compile_plan, get_swapi_resource, read_json, resolve_many,
+    write_json
+)
+from swapi_stats import stage
+
+# Declarative enrichment steps for the Echo Base document. Each node is a dict with a unique
+# 'name' and one of three shapes:
+#   search node: 'resource' + 'search' + 'keys' -- take the first search match, filter and
+#       clean it (the searches of all nodes on one resource are resolved together); with a
+#       'path' the document value at that path supplies defaults (set 'combine' to False to
+#       ignore it) and is replaced by the result.
+#   clean node:  'path' only -- clean the document value at path in place.
+#   crew node:   'path' + 'crew' (role -> node name) -- assign other nodes' results as crew.
+# A node depends on the nodes named in its 'crew' and optional 'depends_on', and on any earlier
+# node whose path is a prefix of (or equal to) its own path.
+ECHO_BASE_SPEC = (
+    {'name': 'hoth', 'path': ('location', 'planet'),
+     'resource': 'planets', 'search': 'Hoth', 'keys': HOTH_KEYS},
+    {'name': 'commander', 'path': ('garrison', 'commander')},
+    {'name': 'dash_rendar', 'path': ('visiting_starships', 'freighters', 1, 'pilot')},
+    {'name': 'snowspeeder', 'path': ('vehicle_assets', 'snowspeeders', 0, 'type'),
+     'resource': 'vehicles', 'search': 'snowspeeder', 'keys': VEHICLE_KEYS},
+    {'name': 'x_wing', 'path': ('starship_assets', 'starfighters', 0, 'type'),
+     'resource': 'starships', 'search': 'T-65 X-wing', 'keys': STARSHIP_KEYS},
+    {'name': 'gr_75', 'path': ('starship_assets', 'transports', 0, 'type'),
+     'resource': 'starships', 'search': 'GR-75 medium transport', 'keys': STARSHIP_KEYS},
+    {'name': 'millennium_falcon', 'path': ('visiting_starships', 'freighters', 0),
+     'resource': 'starships', 'search': 'Millennium Falcon', 'keys': STARSHIP_KEYS},
+    {'name': 'han_solo', 'resource': 'people', 'search': 'han solo', 'keys': PEOPLE_KEYS},
+    {'name': 'chewbacca', 'resource': 'people', 'search': 'Chewbacca', 'keys': PEOPLE_KEYS},
+    {'name': 'falcon_crew', 'path': ('visiting_starships', 'freighters', 0),
+     'crew': {'pilot': 'han_solo', 'copilot': 'chewbacca'}},
+    {'name': 'leia_organa', 'resource': 'people', 'search': 'Leia Organa', 'keys': PEOPLE_KEYS},
+    {'name': 'c_3po', 'resource': 'people', 'search': 'C-3PO', 'keys': PEOPLE_KEYS},
+    {'name': 'luke_skywalker', 'resource': 'people', 'search': 'Luke Skywalker',
+     'keys': PEOPLE_KEYS},
+    {'name': 'r2_d2', 'resource': 'people', 'search': 'R2-D2', 'keys': PEOPLE_KEYS},
+    {'name': 'wedge_antilles', 'resource': 'people', 'search': 'Wedge Antilles',
+     'keys': PEOPLE_KEYS},
+    {'name': 'r5_d4', 'resource': 'people', 'search': 'R5-D4', 'keys': PEOPLE_KEYS},
+)
+
+
+def get_path(document, path):
+    """Returns the value found by following a path of keys/indexes into a document.
+
+    Parameters:
+        document (dict): nested dictionaries and lists.
+        path (tuple): keys and list indexes.
+
+    Returns:
+        object: the value at the path.
+    """
+    value = document
+    for step in path:
+        value = value[step]
+    return value
+
+
+def set_path(document, path, value):
+    """Replaces the value found at a path of keys/indexes in a document.
+
+    Parameters:
+        document (dict): nested dictionaries and lists.
+        path (tuple): keys and list indexes (at least one).
+        value (object): the new value.
+
+    Returns:
+        None
+    """
+    get_path(document, path[:-1])[path[-1]] = value
+
+
+def build_graph(spec):
+    """Validates an enrichment spec and returns each node's dependencies.
+
+    Parameters:
+        spec (tuple): node dicts (see ECHO_BASE_SPEC).
+
+    Returns:
+        dict: node name -> set of names of the nodes it depends on.
+    """
+    names = [node['name'] for node in spec]
+    if len(set(names)) != len(names):
+        raise ValueError('enrichment node names must be unique')
+
+    graph = {}
+    for i, node in enumerate(spec):
+        depends_on = set(node.get('depends_on', ())) | set(node.get('crew', {}).values())
+        if 'path' in node:
+            path = tuple(node['path'])
+            for earlier in spec[:i]:
+                earlier_path = tuple(earlier.get('path', ()))
+                if 'path' in earlier and path[:len(earlier_path)] == earlier_path:
+                    depends_on.add(earlier['name'])
+        unknown = depends_on - set(names)
+        if unknown:
+            raise ValueError(f"node {node['name']!r} depends on unknown nodes {sorted(unknown)}")
+        graph[node['name']] = depends_on
+
+    remaining = {name: set(deps) for name, deps in graph.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"enrichment spec has a dependency cycle among {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return graph
+
+
+def _run_node(node, document, results, resolve, cache):
+    """Executes one enrichment node and returns its result (see ECHO_BASE_SPEC)."""
+    if 'crew' in node:
+        starship = get_path(document, node['path'])
+        return assign_crew(starship, {role: results[name] for role, name in node['crew'].items()})
+
+    if 'search' in node:
+        match = resolve(node['resource'], node['search'])
+        defaults = None
+        if 'path' in node and node.get('combine', True):
+            defaults = get_path(document, node['path'])
+        result = apply_plan(compile_plan(node['keys']), match, defaults, cache)
+    else:
+        result = clean_data(get_path(document, node['path']), cache)
+
+    if 'path' in node:
+        set_path(document, node['path'], result)
+    return result
+
+
+def content_hash(value):
+    """Returns a stable SHA-256 hex digest of a JSON-serializable value.
+
+    Parameters:
+        value (object): value to hash (dictionary key order does not matter).
+
+    Returns:
+        str: hex digest.
+    """
+    text = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def nested_urls(result):
+    """Returns the urls of the nested homeworld/species entities of a node result."""
+    urls = []
+    if isinstance(result, Mapping):
+        for key in DICT_PROPS:
+            value = result.get(key)
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, Mapping) and 'url' in item:
+                    urls.append(item['url'])
+    return urls
+
+
+def load_state(filepath):
+    """Returns the incremental state saved by save_state(), or an empty state if there is none.
+
+    Parameters:
+        filepath (str): path to the state file.
+
+    Returns:
+        dict: node name -> saved node state.
+    """
+    if not os.path.exists(filepath):
+        return {}
+    return read_json(filepath)
+
+
+def save_state(filepath, state):
+    """Writes the incremental state of an enrichment run (see enrich_document).
+
+    Parameters:
+        filepath (str): path to the state file.
+        state (dict): node name -> node state.
+
+    Returns:
+        None
+    """
+    write_json(filepath, state)
+
+
+def _run_incremental(node, document, results, fetch, resolve, cache, state, depends_on):
+    """Executes one enrichment node unless its inputs are unchanged since the state was saved,
+    in which case the saved result is patched into the document instead. The inputs of a node
+    are its spec, the document value at its path, the SWAPI search match it uses, the
+    hashes of the nodes it depends on and the nested entities its result embeds.
+
+    Returns:
+        tuple: (result, True if the saved result was reused).
+    """
+    inputs = [node, [state[name]['hash'] for name in sorted(depends_on)]]
+    if 'path' in node:
+        inputs.append(get_path(document, node['path']))
+    if 'search' in node:
+        inputs.append(resolve(node['resource'], node['search']))
+    digest = content_hash(inputs)
+
+    previous = state.get(node['name'])
+    if previous is not None and previous['inputs'] == digest and all(
+        content_hash(fetch(url, {})) == upstream_hash
+        for url, upstream_hash in previous['upstream'].items()
+    ):
+        result = copy.deepcopy(previous['result'])
+        if 'path' in node:
+            set_path(document, node['path'], result)
+        return result, True
+
+    result = _run_node(node, document, results, resolve, cache)
+    upstream = {url: content_hash(fetch(url, {})) for url in nested_urls(result)}
+    state[node['name']] = {
+        'inputs': digest,
+        'upstream': upstream,
+        'hash': content_hash([digest, upstream]),
+        'result': copy.deepcopy(result),
+    }
+    return result, False
+
+
+def enrich_document(document, spec, cache=None, max_workers=MAX_WORKERS, endpoint=ENDPOINT,
+                    state=None):
+    """Enriches a document in place by executing a declarative spec. Nodes run on a thread pool
+    as soon as the nodes they depend on have finished, so independent steps overlap. Identical
+    SWAPI requests issued by different nodes share one fetch, and the searches of all nodes on
+    one resource are resolved together by a single resolve_many() call.
+
+    When a state is passed (see load_state) the run is incremental: nodes whose inputs hash to
+    the saved values reuse their saved result and only changed subtrees are recomputed. The
+    state is updated in place and can be saved with save_state().
+
+    Parameters:
+        document (dict): the base document (e.g., Echo Base); modified in place.
+        spec (tuple): node dicts (see ECHO_BASE_SPEC).
+        cache (ResponseCache): optional response cache (or SwapiMirror).
+        max_workers (int): maximum number of nodes running at once.
+        endpoint (str): SWAPI root url.
+        state (dict): optional incremental state (node name -> saved node state).
+
+    Returns:
+        tuple: (results, timings) where results maps node name -> node result and timings maps
+        node name -> {'start': seconds after the run began, 'seconds': node duration}; in
+        incremental runs timings also carry 'reused'.
+    """
+    graph = build_graph(spec)
+    nodes = {node['name']: node for node in spec}
+    dependents = {name: [] for name in graph}
+    for name, deps in graph.items():
+        for dep in deps:
+            dependents[dep].append(name)
+    waiting = {name: len(deps) for name, deps in graph.items()}
+
+    shared = {}
+    shared_lock = threading.Lock()
+
+    def once(key, load):
+        with shared_lock:
+            future = shared.get(key)
+            owner = future is None
+            if owner:
+                future = shared[key] = Future()
+        if owner:
+            try:
+                future.set_result(load())
+            except Exception as err:
+                future.set_exception(err)
+        return future.result()
+
+    def fetch(url, params):
+        key = ('fetch', url, tuple(sorted(params.items())))
+        return once(key, lambda: get_swapi_resource(url, params, cache))
+
+    search_names = {}
+    for node in spec:
+        if 'search' in node:
+            search_names.setdefault(node['resource'], []).append(node['search'])
+
+    def resolve(resource, name):
+        names = search_names[resource]
+        matches = once(('resolve', resource), lambda: dict(zip(names, resolve_many(
+            resource, names, cache=cache, max_workers=max_workers, endpoint=endpoint
+        ))))
+        if matches[name] is None:
+            raise LookupError(f"no {resource} match {name!r}")
+        return matches[name]
+
+    results = {}
+    timings = {}
+    run_start = time.perf_counter()
+
+    def run(name):
+        with stage(name):
+            return run_node(name)
+
+    def run_node(name):
+        start = time.perf_counter()
+        if state is None:
+            results[name] = _run_node(nodes[name], document, results, resolve, cache)
+            timings[name] = {'start': start - run_start, 'seconds': time.perf_counter() - start}
+        else:
+            results[name], reused = _run_incremental(
+                nodes[name], document, results, fetch, resolve, cache, state, graph[name]
+            )
+            timings[name] = {
+                'start': start - run_start, 'seconds': time.perf_counter() - start,
+                'reused': reused,
+            }
+        return name
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {executor.submit(run, name) for name, count in waiting.items() if count == 0}
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished = future.result()
+                for name in dependents[finished]:
+                    waiting[name] -= 1
+                    if waiting[name] == 0:
+                        running.add(executor.submit(run, name))
+
+    if state is not None:
+        for name in set(state) - set(nodes):
+            del state[name]
+    ordered = {node['name']: timings[node['name']] for node in spec}
+    return results, ordered
+
+
+def format_timings(timings):
+    """Returns a per-node timing breakdown as printable text.
+
+    Parameters:
+        timings (dict): node timings returned by enrich_document().
+
+    Returns:
+        str: one line per node with its start offset and duration in milliseconds (reused
+        nodes of incremental runs are marked).
+    """
+    width = max((len(name) for name in timings), default=0)
+    return '\n'.join(
+        f"{name:<{width}}  start {timing['start'] * 1000:8.1f} ms  "
+        f"took {timing['seconds'] * 1000:8.1f} ms{'  (reused)' if timing.get('reused') else ''}"
+        for name, timing in timings.items()
+    )
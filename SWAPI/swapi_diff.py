@@ -0,0 +1,273 @@
+import json
+import math
+import os
+import sys
+import tempfile
+import zlib
+from itertools import zip_longest
+
+from swapi_assignment import WHITESPACE, read_json, read_json_array
+
+ALIGN_KEY = 'url'
+REL_TOL = 1e-9
+ABS_TOL = 0.0
+MAX_PENDING = 100000  # unmatched array elements held while streaming before giving up
+MAX_SHOWN = 50  # differences printed by main()
+
+_END = object()
+
+
+def format_path(path):
+    """Returns a diff path as text, e.g. '[url=https://swapi.co/api/planets/1/].climate[0]'."""
+    return ''.join(
+        f"[{step}]" if type(step) is int else
+        f"[{step[0]}={step[1]}]" if type(step) is tuple else f".{step}"
+        for step in path
+    ).lstrip('.') or '$'
+
+
+def _is_number(value):
+    return type(value) in (int, float)
+
+
+def _identity(item, index, key):
+    """Returns the alignment identity of an array element: its key value, or its index. Object
+    and array key values (e.g., a nested homeworld) are not hashable and align by their
+    canonical JSON text."""
+    if type(item) is dict and key in item:
+        value = item[key]
+        if type(value) in (dict, list):
+            value = json.dumps(value, sort_keys=True, ensure_ascii=False)
+        return (key, value)
+    return index
+
+
+def diff_values(old, new, path=(), key=ALIGN_KEY, rel_tol=REL_TOL, abs_tol=ABS_TOL):
+    """Yields the structural differences between two JSON values. Objects are compared key by
+    key regardless of key order, array elements are aligned by the value of their alignment key
+    (elements without it by index), and numbers are equal within the float tolerances.
+
+    Parameters:
+        old (object): previous value.
+        new (object): current value.
+        path (tuple): path of the values (keys, indexes, (key, value) alignment steps).
+        key (str): alignment key of array elements.
+        rel_tol (float): relative tolerance of numbers (see math.isclose).
+        abs_tol (float): absolute tolerance of numbers.
+
+    Returns:
+        generator: (kind, path, old value, new value) tuples where kind is 'added', 'removed'
+        or 'changed'.
+    """
+    if type(old) is dict and type(new) is dict:
+        for name, value in old.items():
+            if name in new:
+                yield from diff_values(value, new[name], path + (name,), key, rel_tol, abs_tol)
+            else:
+                yield 'removed', path + (name,), value, None
+        for name, value in new.items():
+            if name not in old:
+                yield 'added', path + (name,), None, value
+    elif type(old) is list and type(new) is list:
+        yield from diff_arrays(old, new, path, key, rel_tol, abs_tol)
+    elif _is_number(old) and _is_number(new):
+        if not math.isclose(old, new, rel_tol=rel_tol, abs_tol=abs_tol):
+            yield 'changed', path, old, new
+    elif type(old) is not type(new) or old != new:
+        yield 'changed', path, old, new
+
+
+def diff_arrays(old_items, new_items, path=(), key=ALIGN_KEY, rel_tol=REL_TOL, abs_tol=ABS_TOL,
+                max_pending=MAX_PENDING):
+    """Yields the differences between two arrays, read one element at a time from each side.
+    Elements are aligned by their key value (elements without the key by index); an element
+    whose partner has not arrived yet waits in a pending buffer, so memory is bounded by how
+    far apart matching elements are -- constant for outputs written in the same order. Use
+    diff_files(..., partitions=n) for arrays in unrelated orders.
+
+    Parameters:
+        old_items (iterable): previous elements (e.g., a read_json_array() generator).
+        new_items (iterable): current elements.
+        path (tuple): path of the arrays.
+        key (str): alignment key of array elements.
+        rel_tol (float): relative tolerance of numbers.
+        abs_tol (float): absolute tolerance of numbers.
+        max_pending (int): maximum number of unmatched elements held at once.
+
+    Returns:
+        generator: (kind, path, old value, new value) tuples (see diff_values).
+    """
+    pending_old = {}  # identity -> unmatched elements with that identity, in arrival order
+    pending_new = {}
+    pending = 0
+    pairs = zip_longest(enumerate(old_items), enumerate(new_items), fillvalue=(None, _END))
+    for (i, old), (j, new) in pairs:
+        old_id = _identity(old, i, key) if old is not _END else _END
+        new_id = _identity(new, j, key) if new is not _END else _END
+        if old_id == new_id and old_id not in pending_old and old_id not in pending_new:
+            yield from diff_values(old, new, path + (old_id,), key, rel_tol, abs_tol)
+            continue
+        if old is not _END:
+            partner = _take(pending_new, old_id)
+            if partner is _END:
+                pending_old.setdefault(old_id, []).append(old)
+                pending += 1
+            else:
+                pending -= 1
+                yield from diff_values(old, partner, path + (old_id,), key, rel_tol, abs_tol)
+        if new is not _END:
+            partner = _take(pending_old, new_id)
+            if partner is _END:
+                pending_new.setdefault(new_id, []).append(new)
+                pending += 1
+            else:
+                pending -= 1
+                yield from diff_values(partner, new, path + (new_id,), key, rel_tol, abs_tol)
+        if pending > max_pending:
+            raise ValueError(
+                f"more than {max_pending} unmatched elements at {format_path(path)}; the arrays "
+                f"are not in a common order, use diff_files(..., partitions=n)")
+    for identity, items in pending_old.items():
+        for old in items:
+            yield 'removed', path + (identity,), old, None
+    for identity, items in pending_new.items():
+        for new in items:
+            yield 'added', path + (identity,), None, new
+
+
+def _take(pending, identity):
+    """Removes and returns the oldest pending element with an identity, or _END."""
+    items = pending.get(identity)
+    if not items:
+        return _END
+    item = items.pop(0)
+    if not items:
+        del pending[identity]
+    return item
+
+
+def _is_array_file(filepath):
+    """Returns True if the top-level value of a JSON file is an array."""
+    with open(filepath, 'r', encoding='utf-8') as file_obj:
+        while True:
+            chunk = file_obj.read(4096)
+            if not chunk:
+                return False
+            text = chunk[WHITESPACE.match(chunk).end():]
+            if text:
+                return text[0] == '['
+
+
+def _partition(filepath, key, partitions, directory):
+    """Splits the elements of a JSON array file into JSON Lines buckets by a hash of their
+    alignment identity, so matching elements of two files land in buckets with the same
+    number. Each line holds [index, element]."""
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, f"{os.path.basename(filepath)}.{n}.jsonl")
+             for n in range(partitions)]
+    buckets = [open(path, 'w', encoding='utf-8') for path in paths]
+    try:
+        for index, item in enumerate(read_json_array(filepath)):
+            identity = _identity(item, index, key)
+            text = json.dumps(identity, ensure_ascii=False)
+            bucket = buckets[zlib.crc32(text.encode('utf-8')) % partitions]
+            bucket.write(json.dumps([index, item], ensure_ascii=False) + '\n')
+    finally:
+        for bucket in buckets:
+            bucket.close()
+    return paths
+
+
+def _read_bucket(path, key):
+    with open(path, 'r', encoding='utf-8') as file_obj:
+        for line in file_obj:
+            index, item = json.loads(line)
+            yield _identity(item, index, key), item
+
+
+def _diff_partitioned(old_path, new_path, key, rel_tol, abs_tol, partitions):
+    """Diffs two JSON array files in any element order by partitioning both into buckets on
+    disk and aligning one bucket pair at a time in memory (about 1/partitions of a file)."""
+    with tempfile.TemporaryDirectory(prefix='swapi_diff_') as directory:
+        old_buckets = _partition(old_path, key, partitions, os.path.join(directory, 'old'))
+        new_buckets = _partition(new_path, key, partitions, os.path.join(directory, 'new'))
+        for old_bucket, new_bucket in zip(old_buckets, new_buckets):
+            old_items = {}
+            for identity, old in _read_bucket(old_bucket, key):
+                old_items.setdefault(identity, []).append(old)
+            for identity, new in _read_bucket(new_bucket, key):
+                old = _take(old_items, identity)
+                if old is _END:
+                    yield 'added', (identity,), None, new
+                else:
+                    yield from diff_values(old, new, (identity,), key, rel_tol, abs_tol)
+            for identity, items in old_items.items():
+                for old in items:
+                    yield 'removed', (identity,), old, None
+
+
+def diff_files(old_path, new_path, key=ALIGN_KEY, rel_tol=REL_TOL, abs_tol=ABS_TOL,
+               partitions=None, max_pending=MAX_PENDING):
+    """Yields the structural differences between two JSON files. Files whose top-level value
+    is an array (e.g., swapi_planets_uninhabited-v1p1.json) are streamed one element at a
+    time; other documents (e.g., swapi_echo_base-v1p1.json) are loaded and compared whole.
+
+    Parameters:
+        old_path (str): path to the previous (or expected) file.
+        new_path (str): path to the current file.
+        key (str): alignment key of array elements.
+        rel_tol (float): relative tolerance of numbers.
+        abs_tol (float): absolute tolerance of numbers.
+        partitions (int): optional number of on-disk hash partitions for arrays whose
+            elements are not in a common order (memory then scales with 1/partitions).
+        max_pending (int): maximum number of unmatched elements held while streaming.
+
+    Returns:
+        generator: (kind, path, old value, new value) tuples (see diff_values).
+    """
+    if _is_array_file(old_path) and _is_array_file(new_path):
+        if partitions:
+            yield from _diff_partitioned(old_path, new_path, key, rel_tol, abs_tol, partitions)
+        else:
+            yield from diff_arrays(read_json_array(old_path), read_json_array(new_path), (), key,
+                                   rel_tol, abs_tol, max_pending)
+    else:
+        yield from diff_values(read_json(old_path), read_json(new_path), (), key, rel_tol,
+                               abs_tol)
+
+
+def format_change(change):
+    """Returns one difference as a line of text."""
+    kind, path, old, new = change
+    if kind == 'added':
+        return f"+ {format_path(path)}: {json.dumps(new, ensure_ascii=False)}"
+    if kind == 'removed':
+        return f"- {format_path(path)}: {json.dumps(old, ensure_ascii=False)}"
+    return (f"~ {format_path(path)}: {json.dumps(old, ensure_ascii=False)} -> "
+            f"{json.dumps(new, ensure_ascii=False)}")
+
+
+def main(argv=None):
+    """Compares two files given on the command line:
+    swapi_diff.py <old> <new> [--key=url] [--rel-tol=x] [--abs-tol=x] [--partitions=n]
+    Prints the first differences and a count per kind, and exits with status 1 when the files
+    differ (so the command can gate a deploy)."""
+    args = list(sys.argv[1:] if argv is None else argv)
+    options = dict(arg[2:].split('=', 1) for arg in args if arg.startswith('--'))
+    old_path, new_path = [arg for arg in args if not arg.startswith('--')]
+    changes = diff_files(
+        old_path, new_path, options.get('key', ALIGN_KEY),
+        float(options.get('rel-tol', REL_TOL)), float(options.get('abs-tol', ABS_TOL)),
+        int(options['partitions']) if 'partitions' in options else None,
+    )
+    counts = {'added': 0, 'removed': 0, 'changed': 0}
+    for change in changes:
+        if sum(counts.values()) < MAX_SHOWN:
+            print(format_change(change))
+        counts[change[0]] += 1
+    print(', '.join(f"{count} {kind}" for kind, count in counts.items()))
+    return 1 if any(counts.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+from bisect import bisect_left, insort
+
+from swapi_overlay import derive
+
+PASSENGERS_PER_TRANSPORT = 90  # GR-75 medium transport, used when a type lacks 'passengers'
+ESCORTS_PER_TRANSPORT = 2
+
+
+def transport_capacity(starship, overload_multiplier=1):
+    """Returns the number of personnel one transport carries with its passenger overload.
+
+    Parameters:
+        starship (dict): transport type (cleaned SWAPI starship).
+        overload_multiplier (int): passenger overload multiplier of the evacuation plan.
+
+    Returns:
+        int: personnel per transport.
+    """
+    passengers = starship.get('passengers')
+    if not isinstance(passengers, int):
+        passengers = PASSENGERS_PER_TRANSPORT
+    return passengers * overload_multiplier
+
+
+def lift_capacity(transports, overload_multiplier=1):
+    """Returns the number of personnel all available transports carry in a single lift.
+
+    Parameters:
+        transports (list): assets of the form {'type': starship, 'num_available': int}.
+        overload_multiplier (int): passenger overload multiplier of the evacuation plan.
+
+    Returns:
+        int: personnel per lift.
+    """
+    return sum(
+        transport_capacity(asset['type'], overload_multiplier) * asset['num_available']
+        for asset in transports
+    )
+
+
+def roster_units(personnel):
+    """Returns the units to evacuate as (label, size) pairs.
+
+    Parameters:
+        personnel (object): either a group -> head count dictionary (e.g.,
+            echo_base['garrison']['personnel']) or an iterable of (label, size) pairs.
+
+    Returns:
+        list: (label, size) pairs with a positive size.
+    """
+    items = personnel.items() if hasattr(personnel, 'items') else personnel
+    return [(label, size) for label, size in items if size > 0]
+
+
+def _expand(assets):
+    """Returns one entry per available starship, as a list of types."""
+    return [asset['type'] for asset in assets for _ in range(asset['num_available'])]
+
+
+def plan_evacuation(personnel, transports, overload_multiplier=1, escorts=(),
+                    escorts_per_transport=None):
+    """Assigns every unit of personnel to a transport and every transport to its escorts with
+    a best-fit decreasing bin-packing heuristic. Units are packed largest first into the open
+    transport with the least room that still holds the whole unit; a new transport (largest
+    capacity first) is opened only when none does, and a unit larger than any transport is
+    split across full loads. A lift flies only as many transports as can be escorted; when a
+    lift is full the fleet is reused for the next one, so the plan is always complete.
+
+    Runs in O(n log n) for n units plus O(t) per opened transport, so rosters of hundreds of
+    thousands of personnel pack in well under a second when grouped into units.
+
+    Parameters:
+        personnel (object): group -> head count dictionary or iterable of (label, size) pairs.
+        transports (list): assets of the form {'type': starship, 'num_available': int}.
+        overload_multiplier (int): passenger overload multiplier of the evacuation plan.
+        escorts (list): escort assets of the same form (e.g., starfighters).
+        escorts_per_transport (int): escorts each transport requires (defaults to
+            ESCORTS_PER_TRANSPORT when escorts are given, 0 otherwise).
+
+    Returns:
+        dict: the plan -- 'personnel', 'lifts', 'transports_per_lift', 'capacity_per_lift',
+        'transports_used', 'escorts_used' and 'transport_assignments', one copy-on-write
+        transport per flight with its 'lift', 'passengers_assigned', 'manifest' (label -> head
+        count) and 'escorts'.
+    """
+    if escorts_per_transport is None:
+        escorts_per_transport = ESCORTS_PER_TRANSPORT if escorts else 0
+    fleet = sorted(
+        ((transport_capacity(starship, overload_multiplier), starship)
+         for starship in _expand(transports)),
+        key=lambda item: item[0], reverse=True,
+    )
+    fleet = [(capacity, starship) for capacity, starship in fleet if capacity > 0]
+    escort_pool = _expand(escorts)
+    per_lift = len(fleet)
+    if escorts_per_transport:
+        per_lift = min(per_lift, len(escort_pool) // escorts_per_transport)
+    units = sorted(roster_units(personnel), key=lambda unit: unit[1], reverse=True)
+    if units and per_lift == 0:
+        raise ValueError('no transport can fly: not enough transports or escorts')
+    fleet = fleet[:per_lift]
+
+    loads = []  # per opened transport: [fleet index, lift, free room, manifest]
+    open_loads = []  # (free room, load index) of transports with room left, ascending
+
+    def open_transport():
+        index = len(loads) % per_lift
+        loads.append([index, len(loads) // per_lift + 1, fleet[index][0], {}])
+        return len(loads) - 1
+
+    def place(load_index, label, count):
+        load = loads[load_index]
+        load[2] -= count
+        load[3][label] = load[3].get(label, 0) + count
+        if load[2]:
+            insort(open_loads, (load[2], load_index))
+
+    for label, size in units:
+        while size:
+            position = bisect_left(open_loads, (size, -1))
+            if position < len(open_loads):
+                load_index = open_loads.pop(position)[1]
+                place(load_index, label, size)
+                break
+            load_index = open_transport()
+            count = min(size, loads[load_index][2])
+            place(load_index, label, count)
+            size -= count
+
+    assignments = []
+    for index, lift, free, manifest in loads:
+        capacity, starship = fleet[index]
+        first_escort = index * escorts_per_transport
+        assignments.append(derive(starship, {
+            'lift': lift,
+            'passengers_assigned': capacity - free,
+            'manifest': manifest,
+            'escorts': [
+                derive(escort)
+                for escort in escort_pool[first_escort:first_escort + escorts_per_transport]
+            ],
+        }))
+
+    return {
+        'personnel': sum(size for _, size in units),
+        'lifts': loads[-1][1] if loads else 0,
+        'transports_per_lift': per_lift,
+        'capacity_per_lift': sum(capacity for capacity, _ in fleet),
+        'transports_used': len(loads),
+        'escorts_used': min(len(loads), per_lift) * escorts_per_transport,  # reused each lift
+        'transport_assignments': assignments,
+    }
+
+
+def check_plan(plan, personnel, overload_multiplier=1):
+    """Verifies that a plan evacuates every unit exactly once without overloading a transport.
+
+    Parameters:
+        plan (dict): plan returned by plan_evacuation().
+        personnel (object): the roster the plan was built for.
+        overload_multiplier (int): passenger overload multiplier of the evacuation plan.
+
+    Returns:
+        list: violations as messages (empty for a feasible plan).
+    """
+    problems = []
+    assigned = {}
+    for number, transport in enumerate(plan['transport_assignments']):
+        load = sum(transport['manifest'].values())
+        capacity = transport_capacity(transport, overload_multiplier)
+        if load != transport['passengers_assigned']:
+            problems.append(f"transport {number}: manifest lists {load} personnel, "
+                            f"{transport['passengers_assigned']} assigned")
+        if load > capacity:
+            problems.append(f"transport {number}: {load} personnel exceed capacity {capacity}")
+        for label, count in transport['manifest'].items():
+            assigned[label] = assigned.get(label, 0) + count
+    expected = {}
+    for label, size in roster_units(personnel):
+        expected[label] = expected.get(label, 0) + size
+    for label, size in expected.items():
+        if assigned.pop(label, 0) != size:
+            problems.append(f"unit {label!r}: {size} personnel not assigned exactly once")
+    for label in assigned:
+        problems.append(f"unit {label!r} is not on the roster")
+    return problems
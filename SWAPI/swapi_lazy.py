@@ -0,0 +1,147 @@
+import threading
+import weakref
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+MAX_WORKERS = 16
+RESOLVE_BATCH = 256  # streamed elements resolved together by resolve_batches
+
+# id -> proxy created and not resolved yet (proxies compare by content, so they are not
+# hashable); empty unless lazy mode is in use, which lets writers skip resolve_refs() walks
+pending_refs = weakref.WeakValueDictionary()
+pending_refs_lock = threading.Lock()
+
+
+class LazyRef(Mapping):
+    """Read-only proxy for a nested SWAPI entity (e.g., a homeworld or species) that is fetched
+    and cleaned on first access. Reading any key, iterating, comparing or serializing the
+    proxy (write_json encodes mappings through its default hook) resolves it; a proxy that is
+    never read never costs a fetch. Use resolve_refs() to resolve every pending proxy of a
+    document concurrently.
+
+    Parameters:
+        url (str): the url of the nested entity.
+        filter_keys (tuple): keys used to filter the entity before it is cleaned.
+        cache (ResponseCache): optional persistent response cache.
+        resolve (function): resolve(url, filter_keys, cache) returning the cleaned entity
+            (e.g., swapi_assignment.get_nested_entity).
+    """
+
+    __slots__ = ('url', 'filter_keys', 'cache', '_resolve', '_entity', '__weakref__')
+
+    def __init__(self, url, filter_keys, cache, resolve):
+        self.url = url
+        self.filter_keys = filter_keys
+        self.cache = cache
+        self._resolve = resolve
+        self._entity = None
+        with pending_refs_lock:
+            pending_refs[id(self)] = self
+
+    @property
+    def resolved(self):
+        """True once the entity has been fetched and cleaned."""
+        return self._entity is not None
+
+    def resolve(self):
+        """Fetches and cleans the entity unless that already happened, and returns it.
+
+        Parameters:
+            None
+
+        Returns:
+            dict: the filtered and cleaned entity.
+        """
+        if self._entity is None:
+            self._entity = self._resolve(self.url, self.filter_keys, self.cache)
+            with pending_refs_lock:
+                pending_refs.pop(id(self), None)
+        return self._entity
+
+    def __getitem__(self, key):
+        return self.resolve()[key]
+
+    def __iter__(self):
+        return iter(self.resolve())
+
+    def __len__(self):
+        return len(self.resolve())
+
+    def __repr__(self):
+        if self._entity is None:
+            return f"LazyRef({self.url!r})"
+        return repr(self._entity)
+
+
+def iter_refs(data):
+    """Yields every proxy that is still pending in a document.
+
+    Parameters:
+        data (object): nested dictionaries (or other mappings) and lists.
+
+    Returns:
+        generator: pending LazyRef objects, in document order.
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, LazyRef):
+            if not value.resolved:
+                yield value
+        elif isinstance(value, Mapping):
+            stack.extend(reversed(list(value.values())))
+        elif isinstance(value, (list, tuple)):
+            stack.extend(reversed(value))
+
+
+def resolve_refs(data, max_workers=MAX_WORKERS):
+    """Resolves every pending proxy of a document at once, fetching distinct urls
+    concurrently.
+
+    Parameters:
+        data (object): nested dictionaries (or other mappings) and lists.
+        max_workers (int): maximum number of fetches in flight at once.
+
+    Returns:
+        int: number of proxies resolved.
+    """
+    refs = list(iter_refs(data))
+    if not refs:
+        return 0
+    by_url = {}
+    for ref in refs:
+        by_url.setdefault(ref.url, ref)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(LazyRef.resolve, by_url.values()))
+    for ref in refs:
+        ref.resolve()  # memoized by the resolve function, so no further fetches
+    return len(refs)
+
+
+def has_pending():
+    """Returns True if any proxy is still waiting to be resolved."""
+    return bool(pending_refs)
+
+
+def resolve_batches(elements, batch_size=RESOLVE_BATCH):
+    """Yields a stream of elements unchanged, resolving the pending proxies of every batch of
+    elements concurrently before the batch is passed on. Batches are only walked while some
+    proxy is pending, so streams without lazy references pass straight through.
+
+    Parameters:
+        elements (iterable): elements to stream (e.g., a generator of cleaned entities).
+        batch_size (int): number of elements resolved together.
+
+    Returns:
+        generator: the elements in input order.
+    """
+    elements = iter(elements)
+    while True:
+        batch = list(islice(elements, batch_size))
+        if not batch:
+            return
+        if pending_refs:
+            resolve_refs(batch)
+        yield from batch
+
@@ -0,0 +1,237 @@
+import json
+import sqlite3
+import sys
+from urllib.parse import parse_qsl, urlsplit
+
+from swapi_cache import CacheMiss
+from swapi_client import SwapiClient
+from swapi_stats import note
+
+ENDPOINT = 'https://swapi.co/api'
+MIRROR_FILE = 'swapi_mirror.sqlite'
+
+# fields SWAPI matches ?search= terms against, per collection
+SEARCH_FIELDS = {
+    'people': ('name',),
+    'planets': ('name',),
+    'species': ('name',),
+    'starships': ('name', 'model'),
+    'vehicles': ('name', 'model'),
+    'films': ('title',),
+}
+
+
+def canonical_url(url):
+    """Returns a url with a lower-cased scheme and host, no querystring and a trailing slash so
+    that urls built by callers match the urls stored in the mirror.
+
+    Parameters:
+        url (str): a url that specifies a resource.
+
+    Returns:
+        str: canonical url.
+    """
+    parts = urlsplit(url)
+    path = parts.path if parts.path.endswith('/') else parts.path + '/'
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}"
+
+
+def trigrams(text, padded=True):
+    """Returns the set of lower-cased three character substrings of a text. Padded trigrams
+    include the word boundaries (two leading blanks and one trailing blank) and are used for
+    fuzzy matching; unpadded trigrams are those any superstring of the text must contain.
+
+    Parameters:
+        text (str): text to split.
+        padded (bool): include word boundary trigrams.
+
+    Returns:
+        set: trigrams.
+    """
+    text = text.lower()
+    if padded:
+        text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchTable:
+    """The entities of one SWAPI collection, in collection order, indexed for SWAPI's
+    ?search= semantics: a case-insensitive substring match on any of the collection's search
+    fields. A trigram index narrows each search to the entities holding every trigram of the
+    term, so a lookup checks a handful of candidates instead of the whole collection (terms
+    shorter than three characters are matched by a scan).
+
+    Parameters:
+        resource (str): collection name, e.g. 'people'.
+    """
+
+    def __init__(self, resource):
+        self.fields = SEARCH_FIELDS.get(resource, ('name',))
+        self.entities = []
+        self._haystacks = []  # per entity: lower-cased search field values
+        self._postings = {}  # trigram -> ascending positions of the entities containing it
+
+    def __len__(self):
+        return len(self.entities)
+
+    def add(self, entity):
+        """Appends an entity to the collection.
+
+        Parameters:
+            entity (dict): SWAPI entity.
+
+        Returns:
+            None
+        """
+        position = len(self.entities)
+        haystack = tuple(
+            value.lower() for value in (entity.get(field) for field in self.fields)
+            if isinstance(value, str)
+        )
+        self.entities.append(entity)
+        self._haystacks.append(haystack)
+        for gram in set().union(*(trigrams(value, padded=False) for value in haystack)):
+            self._postings.setdefault(gram, []).append(position)
+
+    def search(self, term):
+        """Returns the entities whose search fields contain the term.
+
+        Parameters:
+            term (str): search term (case-insensitive substring).
+
+        Returns:
+            list: matching entities in collection order.
+        """
+        term = term.lower()
+        grams = trigrams(term, padded=False)
+        if grams:
+            postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+            candidates = sorted(set(postings[0]).intersection(*postings[1:]))
+        else:
+            candidates = range(len(self.entities))
+        haystacks = self._haystacks
+        return [
+            self.entities[position] for position in candidates
+            if any(term in value for value in haystacks[position])
+        ]
+
+
+def mirror_swapi(endpoint=ENDPOINT, filepath=MIRROR_FILE, resources=tuple(SEARCH_FIELDS),
+                 client=None):
+    """Walks every page of each SWAPI collection (following the 'next' links) and writes the
+    entities to a local SQLite store that SwapiMirror can serve from without a network.
+    Existing rows are replaced so the command can be rerun to refresh the mirror.
+
+    Parameters:
+        endpoint (str): SWAPI root url.
+        filepath (str): path to the SQLite mirror file.
+        resources (tuple): names of the collections to mirror.
+        client (SwapiClient): optional pooled client; a new one is created if not provided.
+
+    Returns:
+        int: number of entities written.
+    """
+    if client is None:
+        client = SwapiClient()
+
+    conn = sqlite3.connect(filepath)
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS entities ('
+        'url TEXT PRIMARY KEY, resource TEXT NOT NULL, position INTEGER NOT NULL, '
+        'body TEXT NOT NULL)'
+    )
+    count = 0
+    for resource in resources:
+        url = f"{endpoint}/{resource}/"
+        position = 0
+        while url:
+            page = client.get_json(url)
+            for entity in page['results']:
+                conn.execute(
+                    'INSERT OR REPLACE INTO entities (url, resource, position, body) '
+                    'VALUES (?, ?, ?, ?)',
+                    (canonical_url(entity['url']), resource, position,
+                     json.dumps(entity, ensure_ascii=False))
+                )
+                position += 1
+            url = page['next']
+        count += position
+        conn.commit()
+    conn.close()
+    return count
+
+
+class SwapiMirror:
+    """Read-only, in-memory view of a mirror written by mirror_swapi(). Answers direct entity
+    urls and collection '?search=' queries using SWAPI's case-insensitive substring matching
+    (from a trigram index per collection, see SearchTable), so that it can be passed to
+    get_swapi_resource() wherever a ResponseCache is accepted.
+
+    Parameters:
+        filepath (str): path to the SQLite mirror file.
+        endpoint (str): SWAPI root url used to recognize collection urls.
+    """
+
+    def __init__(self, filepath=MIRROR_FILE, endpoint=ENDPOINT):
+        self.entities = {}
+        self.collections = {}
+        collection_urls = {
+            resource: canonical_url(f"{endpoint}/{resource}/") for resource in SEARCH_FIELDS
+        }
+        conn = sqlite3.connect(filepath)
+        rows = conn.execute('SELECT url, resource, body FROM entities ORDER BY resource, position')
+        for url, resource, body in rows:
+            entity = json.loads(body)
+            self.entities[url] = entity
+            table = self.collections.get(collection_urls[resource])
+            if table is None:
+                table = self.collections[collection_urls[resource]] = SearchTable(resource)
+            table.add(entity)
+        conn.close()
+
+    def __len__(self):
+        return len(self.entities)
+
+    def search(self, collection_url, term):
+        """Returns the entities of a collection whose search fields contain the term.
+
+        Parameters:
+            collection_url (str): canonical url of the collection.
+            term (str): search term (case-insensitive substring).
+
+        Returns:
+            list: matching entities in collection order.
+        """
+        table = self.collections.get(collection_url)
+        return table.search(term) if table is not None else []
+
+    def get_json(self, url, params=None):
+        """Returns a decoded SWAPI document for a request, answered from the mirror.
+
+        Parameters:
+            url (str): a url that specifies the resource.
+            params (dict): optional dictionary of querystring arguments.
+
+        Returns:
+            dict: the entity, or a single page of collection results.
+        """
+        note(cache='mirror')
+        key = canonical_url(url)
+        entity = self.entities.get(key)
+        if entity is not None:
+            return entity
+
+        if key not in self.collections:
+            raise CacheMiss(url)
+
+        query = dict(parse_qsl(urlsplit(url).query))
+        query.update(params or {})
+        if 'search' in query:
+            results = self.search(key, query['search'])
+        else:
+            results = list(self.collections[key].entities)
+        return {'count': len(results), 'next': None, 'previous': None, 'results': results}
+
+
+if __name__ == '__main__':
+    print(mirror_swapi(filepath=sys.argv[1] if len(sys.argv) > 1 else MIRROR_FILE))
@@ -0,0 +1,150 @@
+from collections.abc import Mapping, MutableMapping
+
+
+class _Deleted:
+    """Marks a key deleted from an overlay while it is still present in a shared layer."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return '<deleted>'
+
+    def __reduce__(self):
+        return '_DELETED'  # copies and pickles stay the module singleton
+
+
+_DELETED = _Deleted()
+
+
+class Overlay(MutableMapping):
+    """Copy-on-write dictionary layered over a shared base dictionary. Lookups try the
+    overlay's own layer first and fall through to the base; writes and deletions only touch
+    the own layer, so a derived entity holds just its own overrides while the base (e.g., a
+    starship type record shared by thousands of instances) is stored once. Overlays are
+    slotted and hold the two layers directly, so the fixed cost per instance is one object
+    and its own dictionary. Iteration order matches base.copy() followed by update(), and
+    copy() is itself copy-on-write. The base must not be modified after overlays are built
+    on it.
+
+    Use derive() to build one; serialize with json_default (write_json does this for you).
+
+    Parameters:
+        own (dict): the overlay's own key-value pairs (used as is, not copied).
+        base (dict): shared default key-value pairs.
+    """
+
+    __slots__ = ('own', 'base')
+
+    def __init__(self, own=None, base=None):
+        self.own = {} if own is None else own
+        self.base = {} if base is None else base
+
+    def __getitem__(self, key):
+        own = self.own
+        if key in own:
+            value = own[key]
+            if value is _DELETED:
+                raise KeyError(key)
+            return value
+        return self.base[key]
+
+    def __setitem__(self, key, value):
+        self.own[key] = value
+
+    def __contains__(self, key):
+        if key in self.own:
+            return self.own[key] is not _DELETED
+        return key in self.base
+
+    def __iter__(self):
+        own = self.own
+        for key in self.base:
+            if own.get(key) is not _DELETED:
+                yield key
+        for key, value in own.items():
+            if value is not _DELETED and key not in self.base:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __bool__(self):
+        return any(True for _ in self)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if key in self.base:
+            self.own[key] = _DELETED
+        else:
+            del self.own[key]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def copy(self):
+        """Returns a copy-on-write copy sharing the same base."""
+        return type(self)(dict(self.own), self.base)
+
+    __copy__ = copy
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self):
+        for key in reversed(list(self)):
+            return key, self.pop(key)
+        raise KeyError('popitem(): overlay is empty')
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+    def __reduce__(self):
+        return type(self), (self.own, self.base)
+
+    def to_dict(self):
+        """Returns the merged view as a plain dictionary (nested values are shared)."""
+        return {key: self[key] for key in self}
+
+
+def derive(base, overrides=None):
+    """Returns a copy-on-write entity layered over a shared base dictionary.
+
+    Parameters:
+        base (dict): shared default key-value pairs; when base is an Overlay its own
+            overrides are copied and its base is reused.
+        overrides (dict): optional key-value pairs that override the base; copied into the
+            new entity's own layer.
+
+    Returns:
+        Overlay: derived entity.
+    """
+    if isinstance(base, Overlay):
+        return Overlay({**base.own, **(overrides or {})}, base.base)
+    return Overlay(dict(overrides or {}), base)
+
+
+def json_default(value):
+    """json default hook that encodes overlays (and any other mapping) as JSON objects.
+
+    Parameters:
+        value (object): object json cannot encode by itself.
+
+    Returns:
+        dict: plain dictionary with the same items.
+    """
+    if isinstance(value, Overlay):
+        return value.to_dict()
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,127 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from operator import itemgetter
+
+from swapi_assignment import DICT_PROPS, compile_plan
+
+CHUNK_SIZE = 2000  # entities per task sent to a worker process
+
+
+class _Absent:
+    """Marks a key missing from an entity inside a compact row. Pickled by reference so the
+    marker keeps its identity across processes."""
+
+    def __reduce__(self):
+        return '_ABSENT'
+
+
+_ABSENT = _Absent()
+
+
+def _clean_rows(keys, rows):
+    """Worker task: cleans compact rows (tuples of values in key order) and returns compact
+    rows of cleaned values.
+
+    Parameters:
+        keys (tuple): keys the row values belong to; none of them may require a fetch.
+        rows (list): tuples of raw values (_ABSENT where an entity lacks a key).
+
+    Returns:
+        list: tuples of cleaned values in the same order.
+    """
+    converters = [convert for key, convert in compile_plan(keys)]
+    return [
+        tuple(
+            value if value is _ABSENT else convert(value, None)
+            for convert, value in zip(converters, row)
+        )
+        for row in rows
+    ]
+
+
+def iter_clean_parallel(entities, filter_keys, workers=None, chunk_size=CHUNK_SIZE, cache=None):
+    """Filters and cleans entities on a pool of worker processes and yields the cleaned entities
+    in input order. The input is consumed lazily in chunks and at most two chunks per worker
+    are in flight, so streams of any length can be processed in bounded memory.
+
+    Entities travel to the workers as compact tuples of the values of the filter keys (no
+    dictionaries, no key strings) and come back the same way. Nested homeworld/species urls
+    are resolved in the parent process through the memoized get_nested_entity(), so workers
+    only do CPU work and never touch the network.
+
+    Parameters:
+        entities (iterable): source entities.
+        filter_keys (tuple): keys to keep, e.g. PLANET_KEYS or PEOPLE_KEYS.
+        workers (int): number of worker processes (defaults to the CPU count).
+        chunk_size (int): number of entities per task.
+        cache (ResponseCache): optional response cache for nested resource lookups.
+
+    Returns:
+        generator: cleaned entities in input order.
+    """
+    local_keys = tuple(key for key in filter_keys if key not in DICT_PROPS)
+    nested = {key: convert for key, convert in compile_plan(filter_keys) if key in DICT_PROPS}
+    workers = workers or os.cpu_count()
+    entities = iter(entities)
+    if not local_keys:
+        #only nested lookups, which run in this process anyway: no work for the pool
+        for entity in entities:
+            yield {key: nested[key](entity[key], cache) for key in filter_keys if key in entity}
+        return
+    getter = itemgetter(*local_keys)
+    single = len(local_keys) == 1  # itemgetter of one key returns the value, not a tuple
+
+    def to_row(entity):
+        try:
+            row = getter(entity)
+        except KeyError:
+            return tuple(entity.get(key, _ABSENT) for key in local_keys)
+        return (row,) if single else row
+
+    def next_chunk():
+        chunk = list(islice(entities, chunk_size))
+        return chunk, [to_row(entity) for entity in chunk]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        while True:
+            while len(pending) < 2 * workers:
+                chunk, rows = next_chunk()
+                if not chunk:
+                    break
+                pending.append((chunk, executor.submit(_clean_rows, local_keys, rows)))
+            if not pending:
+                return
+
+            chunk, future = pending.popleft()
+            for entity, row in zip(chunk, future.result()):
+                if not nested and _ABSENT not in row:
+                    yield dict(zip(local_keys, row))
+                    continue
+                values = dict(zip(local_keys, row))
+                cleaned = {}
+                for key in filter_keys:
+                    if key in nested:
+                        if key in entity:
+                            cleaned[key] = nested[key](entity[key], cache)
+                    elif values[key] is not _ABSENT:
+                        cleaned[key] = values[key]
+                yield cleaned
+
+
+def clean_parallel(entities, filter_keys, workers=None, chunk_size=CHUNK_SIZE, cache=None):
+    """Filters and cleans entities on a pool of worker processes (see iter_clean_parallel).
+
+    Parameters:
+        entities (iterable): source entities.
+        filter_keys (tuple): keys to keep, e.g. PLANET_KEYS or PEOPLE_KEYS.
+        workers (int): number of worker processes (defaults to the CPU count).
+        chunk_size (int): number of entities per task.
+        cache (ResponseCache): optional response cache for nested resource lookups.
+
+    Returns:
+        list: cleaned entities in input order.
+    """
+    return list(iter_clean_parallel(entities, filter_keys, workers, chunk_size, cache))
@@ -0,0 +1,182 @@
+from collections.abc import Mapping
+
+from swapi_assignment import PEOPLE_KEYS, PLANET_KEYS, SPECIES_KEYS, STARSHIP_KEYS, VEHICLE_KEYS
+
+# url -> record shared by every record that nests the entity (see intern_record)
+interned_records = {}
+
+
+class Record:
+    """Base class of the slotted SWAPI record types built by record_type(). A record stores one
+    slot per key instead of a per-instance dictionary; keys absent from the source dictionary
+    are left unset and are omitted again by to_dict(), so cleaned entities (whose keys follow
+    the filter key order) round-trip losslessly.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+    @classmethod
+    def from_dict(cls, data, interned=None):
+        """Returns a record holding the values of a dictionary. Nested homeworld/species
+        dictionaries become shared records (see intern_record).
+
+        Parameters:
+            data (dict): cleaned entity whose keys are a subset of the record's keys.
+            interned (dict): url -> record table used to share nested entities
+                (defaults to the module-level interned_records).
+
+        Returns:
+            Record: new record.
+        """
+        if interned is None:
+            interned = interned_records
+        record = cls.__new__(cls)
+        for key, value in data.items():
+            nested = NESTED_TYPES.get(key)
+            if nested is not None:
+                if isinstance(value, Mapping):
+                    value = intern_record(nested, value, interned)
+                elif isinstance(value, list):
+                    value = [
+                        intern_record(nested, item, interned) if isinstance(item, Mapping) else item
+                        for item in value
+                    ]
+            try:
+                setattr(record, key, value)
+            except AttributeError:
+                raise KeyError(f"{cls.__name__} has no field {key!r}") from None
+        return record
+
+    def items(self):
+        """Returns the (key, value) pairs of the set fields in key order (nested records are
+        returned as records)."""
+        items = []
+        for key in self.__slots__:
+            try:
+                items.append((key, getattr(self, key)))
+            except AttributeError:
+                pass
+        return items
+
+    def to_dict(self):
+        """Returns the record as a plain dictionary, converting nested records as well.
+
+        Parameters:
+            None
+
+        Returns:
+            dict: entity dictionary equal to the one the record was built from.
+        """
+        data = {}
+        for key, value in self.items():
+            if isinstance(value, Record):
+                value = value.to_dict()
+            elif isinstance(value, list) and value and isinstance(value[0], Record):
+                value = [item.to_dict() if isinstance(item, Record) else item for item in value]
+            data[key] = value
+        return data
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.items() == other.items()
+
+    def __repr__(self):
+        fields = ', '.join(f"{key}={value!r}" for key, value in self.items())
+        return f"{type(self).__name__}({fields})"
+
+
+def record_type(name, keys):
+    """Returns a new slotted record class with one slot per key.
+
+    Parameters:
+        name (str): class name.
+        keys (tuple): entity keys, e.g. PLANET_KEYS; they become the slots in this order.
+
+    Returns:
+        type: Record subclass.
+    """
+    return type(name, (Record,), {'__slots__': tuple(keys)})
+
+
+Person = record_type('Person', PEOPLE_KEYS)
+Planet = record_type('Planet', PLANET_KEYS)
+Species = record_type('Species', SPECIES_KEYS)
+Starship = record_type('Starship', STARSHIP_KEYS)
+Vehicle = record_type('Vehicle', VEHICLE_KEYS)
+
+# filter keys -> record type
+RECORD_TYPES = {
+    PEOPLE_KEYS: Person,
+    PLANET_KEYS: Planet,
+    SPECIES_KEYS: Species,
+    STARSHIP_KEYS: Starship,
+    VEHICLE_KEYS: Vehicle,
+}
+
+# nested entity key -> record type of the nested entity
+NESTED_TYPES = {
+    'homeworld': Planet,
+    'species': Species,
+}
+
+
+def intern_record(record_class, data, interned=None):
+    """Returns the shared record for a nested entity, building it on first use. Entities are
+    identified by url; entities without a url are not shared.
+
+    Parameters:
+        record_class (type): Record subclass to build.
+        data (dict): cleaned entity.
+        interned (dict): url -> record table (defaults to the module-level interned_records).
+
+    Returns:
+        Record: shared record.
+    """
+    if interned is None:
+        interned = interned_records
+    url = data.get('url')
+    if url is None:
+        return record_class.from_dict(data, interned)
+    record = interned.get(url)
+    if record is None:
+        record = interned.setdefault(url, record_class.from_dict(data, interned))
+    return record
+
+
+def reset_interned_records():
+    """Empties the shared nested record table."""
+    interned_records.clear()
+
+
+def to_records(entities, filter_keys, interned=None):
+    """Converts cleaned entity dictionaries into records.
+
+    Parameters:
+        entities (iterable): cleaned entities, e.g. the output of clean_many().
+        filter_keys (tuple): keys the entities were filtered with (selects the record type).
+        interned (dict): url -> record table used to share nested entities.
+
+    Returns:
+        list: records.
+    """
+    from_dict = RECORD_TYPES[filter_keys].from_dict
+    return [from_dict(entity, interned) for entity in entities]
+
+
+def to_json(obj):
+    """json default hook that serializes records, e.g. write_json(path, data, to_json).
+
+    Parameters:
+        obj (object): object json cannot encode.
+
+    Returns:
+        dict: the record's fields (nested records are serialized by further calls).
+    """
+    if isinstance(obj, Record):
+        return dict(obj.items())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,213 @@
+import heapq
+import itertools
+import threading
+import time
+
+import requests
+
+from swapi_client import RETRY_STATUSES, SwapiClient, backoff_delay, retry_after_delay
+
+INTERACTIVE = 0  # user-facing lookups
+BACKGROUND = 10  # mirroring and other batch work
+RATE = 10.0  # requests per second
+BURST = 10  # requests that may be sent back to back after an idle period
+MIN_RATE = 0.1  # requests per second the adaptive rate never drops below
+RATE_DECREASE = 0.5  # rate multiplier applied on every 429 response
+RATE_RECOVERY = 0.05  # share of the configured rate regained per successful response
+MAX_RETRIES = 5
+
+
+def reset_delay(value, now=None):
+    """Returns the seconds until a rate limit window resets, given an X-RateLimit-Reset header
+    holding either a delay in seconds or a Unix timestamp.
+
+    Parameters:
+        value (str): header value.
+        now (float): current Unix time (defaults to time.time()).
+
+    Returns:
+        float: seconds to wait, or None if the value is not a number.
+    """
+    try:
+        reset = float(value)
+    except (TypeError, ValueError):
+        return None
+    if reset > 1e9:
+        reset -= time.time() if now is None else now
+    return max(reset, 0.0)
+
+
+class FetchScheduler:
+    """Coordinates SWAPI requests from any number of threads through one token bucket. Callers
+    wait in priority order (lower values first, FIFO within a priority) for a token; tokens
+    refill at the current rate up to the burst size. The rate adapts to the server: a 429
+    halves it and pauses every caller for the Retry-After delay (or a jittered backoff), an
+    exhausted X-RateLimit-Remaining pauses until X-RateLimit-Reset, and successful responses
+    regain the configured rate step by step. 429/5xx responses are retried through the bucket.
+
+    The scheduler has the client interface (get/get_json), so it can be passed wherever a
+    SwapiClient is accepted (e.g., ResponseCache(client=scheduler)); use at_priority() to
+    hand out a client bound to another priority class.
+
+    Parameters:
+        client (SwapiClient): HTTP client (defaults to a SwapiClient without its own retries).
+        rate (float): maximum requests per second.
+        burst (int): bucket size.
+        max_retries (int): maximum retries per request.
+    """
+
+    def __init__(self, client=None, rate=RATE, burst=BURST, max_retries=MAX_RETRIES):
+        self.client = client if client is not None else SwapiClient(max_retries=0)
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.tokens = float(burst)
+        self.paused_until = 0.0
+        self.metrics = {'requests': 0, 'throttled': 0, 'retries': 0, 'wait_seconds': 0.0}
+        self._updated = time.monotonic()
+        self._queue = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority=INTERACTIVE):
+        """Blocks until the caller is first in line and a token is available, then takes it.
+
+        Parameters:
+            priority (int): priority class (lower values are served first).
+
+        Returns:
+            None
+        """
+        start = time.monotonic()
+        with self._cond:
+            entry = (priority, next(self._order))
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._queue[0] != entry:
+                        timeout = None
+                    elif now < self.paused_until:
+                        timeout = self.paused_until - now
+                    elif self.tokens >= 1:
+                        break
+                    else:
+                        timeout = (1 - self.tokens) / self.rate
+                    self._cond.wait(timeout)
+            except BaseException:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._queue)
+            self.tokens -= 1
+            self.metrics['wait_seconds'] += time.monotonic() - start
+            self._cond.notify_all()
+
+    def _observe(self, response):
+        """Adapts the rate and pauses the bucket according to a response."""
+        with self._cond:
+            self.metrics['requests'] += 1
+            now = time.monotonic()
+            pause = None
+            if response.status_code == 429:
+                self.metrics['throttled'] += 1
+                self.rate = max(MIN_RATE, self.rate * RATE_DECREASE)
+                pause = retry_after_delay(response)
+                if pause is None:
+                    pause = backoff_delay(min(self.metrics['throttled'], 10))
+            elif response.status_code < 400:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_RECOVERY)
+            if response.headers.get('X-RateLimit-Remaining') == '0':
+                reset = reset_delay(response.headers.get('X-RateLimit-Reset'))
+                if reset is not None:
+                    pause = max(pause or 0.0, reset)
+            if pause is not None:
+                self._refill(now)
+                self.tokens = 0.0
+                self.paused_until = max(self.paused_until, now + pause)
+                self._cond.notify_all()
+
+    def get(self, url, params=None, headers=None, priority=INTERACTIVE):
+        """Issues an HTTP GET request once the bucket allows it, retrying 429/5xx responses and
+        connection errors.
+
+        Parameters:
+            url (str): a url that specifies the resource.
+            params (dict): optional dictionary of querystring arguments.
+            headers (dict): optional request headers.
+            priority (int): priority class (INTERACTIVE, BACKGROUND or any int).
+
+        Returns:
+            requests.Response: the final response.
+        """
+        attempt = 0
+        while True:
+            self.acquire(priority)
+            try:
+                response = self.client.get(url, params=params, headers=headers)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+            else:
+                self._observe(response)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                response.close()
+                # 429 pauses the whole bucket; other errors only back off this caller
+                delay = 0 if response.status_code == 429 else backoff_delay(attempt)
+            with self._cond:
+                self.metrics['retries'] += 1
+            attempt += 1
+            time.sleep(delay)
+
+    def get_json(self, url, params=None, priority=INTERACTIVE):
+        """Issues a scheduled HTTP GET request and returns the decoded JSON document.
+
+        Parameters:
+            url (str): a url that specifies the resource.
+            params (dict): optional dictionary of querystring arguments.
+            priority (int): priority class.
+
+        Returns:
+            dict: decoded JSON document expressed as dictionary.
+        """
+        return self.get(url, params, priority=priority).json()
+
+    def at_priority(self, priority):
+        """Returns a client whose requests go through this scheduler at a priority class, e.g.
+        mirror_swapi(client=scheduler.at_priority(BACKGROUND)).
+
+        Parameters:
+            priority (int): priority class.
+
+        Returns:
+            ScheduledClient: client bound to the priority.
+        """
+        return ScheduledClient(self, priority)
+
+
+class ScheduledClient:
+    """Client interface (get/get_json) bound to one priority class of a FetchScheduler.
+
+    Parameters:
+        scheduler (FetchScheduler): scheduler the requests go through.
+        priority (int): priority class.
+    """
+
+    def __init__(self, scheduler, priority):
+        self.scheduler = scheduler
+        self.priority = priority
+
+    def get(self, url, params=None, headers=None):
+        return self.scheduler.get(url, params, headers, self.priority)
+
+    def get_json(self, url, params=None):
+        return self.scheduler.get_json(url, params, self.priority)
@@ -0,0 +1,184 @@
+import os
+import re
+from itertools import islice
+
+from swapi_assignment import (
+    CONVERTERS, FLOAT_PROPS, INT_PROPS, LIST_PROPS, PEOPLE_KEYS, PLANET_KEYS, SPECIES_KEYS,
+    STARSHIP_KEYS, VEHICLE_KEYS, apply_plan, get_nested_entity, is_unknown, read_json,
+    read_json_array, skip_unknown, write_json
+)
+from swapi_search import resource_of
+
+SCHEMA_SAMPLE_SIZE = 1000  # records profiled per source
+TYPE_MIN_SHARE = 0.9  # share of known sampled values that must parse for a numeric kind
+LIST_MIN_SHARE = 0.2  # share of known sampled values that must contain the list delimiter
+LIST_DELIMITER = ', '
+SENTENCE_PUNCTUATION = frozenset('.!?;:\r\n')  # marks prose, which is never split into a list
+SCHEMA_SUFFIX = '.schema.json'
+SCHEMA_VERSION = 2  # bumped when inference rules change, so stale sidecars are inferred again
+
+INT_PATTERN = re.compile(r'[+-]?\d+\Z')
+FLOAT_PATTERN = re.compile(r'[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\Z')
+GRAVITY_PATTERN = re.compile(r'[+-]?(\d+\.?\d*|\.\d+)( *standard)?\Z')
+URL_PATTERN = re.compile(r'https?://\S+/\d+/?\Z')
+
+# resource -> keys kept for nested entities of that resource
+NESTED_KEYS = {
+    'people': PEOPLE_KEYS,
+    'planets': PLANET_KEYS,
+    'species': SPECIES_KEYS,
+    'starships': STARSHIP_KEYS,
+    'vehicles': VEHICLE_KEYS,
+}
+
+# (absolute path, mtime, size, sample size) -> inferred schema
+inferred_schemas = {}
+
+
+@skip_unknown
+def _clean_nested(value, cache):
+    keys = NESTED_KEYS.get(resource_of(value)) if type(value) is str else None
+    if keys is None:
+        return value
+    return get_nested_entity(value, keys, cache)
+
+
+def known_kind(key):
+    """Returns the converter kind clean_data() uses for a hard-coded key, or None."""
+    if key == 'gravity':
+        return 'gravity'
+    if key in FLOAT_PROPS:
+        return 'float'
+    if key in INT_PROPS:
+        return 'int'
+    if key in LIST_PROPS:
+        return 'list'
+    if key in ('homeworld', 'species'):
+        return key
+    return None
+
+
+def infer_kind(key, values):
+    """Infers the converter kind of a field from sampled values: 'int', 'float', 'gravity'
+    (numbers with a 'standard' unit), 'list' (delimited strings), 'nested' (SWAPI entity urls),
+    'unknown' (only unknown sentinels) or 'other' (kept verbatim). A field is 'int' only when
+    every known value is an integer, so a few decimals make it 'float' instead, and never a
+    'list' when any value reads as prose (sentence punctuation).
+
+    Parameters:
+        key (str): field name.
+        values (list): sampled raw values of the field.
+
+    Returns:
+        str: converter kind.
+    """
+    known = [value for value in values if not is_unknown(value)]
+    if not known:
+        return 'unknown' if values else 'other'
+    if any(type(value) is not str for value in known):
+        return 'other'
+
+    def share(matches):
+        return sum(1 for value in known if matches(value.strip())) / len(known)
+
+    if key != 'url' and share(URL_PATTERN.match) == 1:
+        return 'nested'
+    if share(INT_PATTERN.match) == 1:
+        return 'int'
+    if share(FLOAT_PATTERN.match) >= TYPE_MIN_SHARE:
+        return 'float'
+    if share(GRAVITY_PATTERN.match) >= TYPE_MIN_SHARE and share(lambda value: 'standard' in value):
+        return 'gravity'
+    if share(lambda value: LIST_DELIMITER in value) >= LIST_MIN_SHARE and not any(
+            SENTENCE_PUNCTUATION.intersection(value) for value in known):
+        return 'list'
+    return 'other'
+
+
+def infer_schema(records, sample_size=SCHEMA_SAMPLE_SIZE):
+    """Profiles the first records of a source and returns the converter kind of every field.
+    Keys clean_data() already knows keep their hard-coded kind.
+
+    Parameters:
+        records (iterable): raw entities.
+        sample_size (int): number of records to profile.
+
+    Returns:
+        dict: key -> converter kind, in first-seen key order.
+    """
+    columns = {}
+    for record in islice(records, sample_size):
+        for key, value in record.items():
+            columns.setdefault(key, []).append(value)
+    return {key: known_kind(key) or infer_kind(key, values) for key, values in columns.items()}
+
+
+def compile_schema(schema, keys=None):
+    """Compiles an inferred schema into a cleaning plan for apply_plan() and clean_many().
+
+    Parameters:
+        schema (dict): key -> converter kind returned by infer_schema().
+        keys (tuple): optional keys to keep (defaults to every key of the schema).
+
+    Returns:
+        tuple: compiled plan of (key, converter) pairs.
+    """
+    plan = []
+    for key in schema if keys is None else keys:
+        kind = schema.get(key, 'other')
+        if kind == 'nested':
+            plan.append((key, _clean_nested))
+        else:
+            plan.append((key, CONVERTERS.get(kind, CONVERTERS['other'])))
+    return tuple(plan)
+
+
+def schema_for_file(filepath, sample_size=SCHEMA_SAMPLE_SIZE):
+    """Returns the inferred schema of a JSON array file. Schemas are cached in memory and in a
+    sidecar file (filepath + '.schema.json') and are inferred again only when the source file
+    changes.
+
+    Parameters:
+        filepath (str): path to a JSON document whose top-level value is an array of entities.
+        sample_size (int): number of records to profile.
+
+    Returns:
+        dict: key -> converter kind.
+    """
+    stat = os.stat(filepath)
+    source = {
+        'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sample_size': sample_size,
+        'version': SCHEMA_VERSION,
+    }
+    cache_key = (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size, sample_size)
+    schema = inferred_schemas.get(cache_key)
+    if schema is not None:
+        return schema
+
+    sidecar = filepath + SCHEMA_SUFFIX
+    if os.path.exists(sidecar):
+        saved = read_json(sidecar)
+        if saved.get('source') == source:
+            schema = saved['schema']
+    if schema is None:
+        schema = infer_schema(read_json_array(filepath), sample_size)
+        write_json(sidecar, {'source': source, 'schema': schema})
+    inferred_schemas[cache_key] = schema
+    return schema
+
+
+def iter_clean_file(filepath, keys=None, cache=None):
+    """Streams the entities of a JSON array file through the plan compiled from its inferred
+    schema.
+
+    Parameters:
+        filepath (str): path to a JSON document whose top-level value is an array of entities.
+        keys (tuple): optional keys to keep (defaults to every profiled key).
+        cache (ResponseCache): optional response cache for nested resource lookups.
+
+    Returns:
+        generator: cleaned entities in file order.
+    """
+    plan = compile_schema(schema_for_file(filepath), keys)
+    for record in read_json_array(filepath):
+        yield apply_plan(plan, record, None, cache)
@@ -0,0 +1,246 @@
+import math
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+
+from swapi_mirror import SEARCH_FIELDS, canonical_url, trigrams
+
+FUZZY_MIN_SCORE = 0.3  # minimum trigram similarity of a fuzzy candidate
+
+
+def resource_of(url):
+    """Returns the collection name of a SWAPI entity url (e.g., 'people' for .../people/1/).
+
+    Parameters:
+        url (str): entity url.
+
+    Returns:
+        str: collection name, or None if the url does not name an entity.
+    """
+    segments = [segment for segment in urlsplit(url).path.split('/') if segment]
+    if len(segments) >= 2 and segments[-1].isdigit():
+        return segments[-2]
+    return None
+
+
+class SearchIndex:
+    """In-memory trigram index over SWAPI entities (people, starships, vehicles, planets,
+    species, films) that answers substring and fuzzy lookups locally. Entities are indexed on
+    the fields SWAPI's ?search= matches (see swapi_mirror.SEARCH_FIELDS). Adding an entity that
+    is already indexed replaces it, so the index can follow a ResponseCache as it fills
+    (see watch()).
+    """
+
+    def __init__(self):
+        self.entities = {}  # canonical url -> entity
+        self._entries = {}  # entry id -> (url, resource, lower-cased field text, trigram count)
+        self._entry_ids = {}  # canonical url -> entry ids of the entity's fields
+        self._postings = {}  # trigram -> set of entry ids
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entities)
+
+    @classmethod
+    def from_mirror(cls, mirror):
+        """Returns an index over every entity of a SwapiMirror.
+
+        Parameters:
+            mirror (SwapiMirror): local SWAPI mirror.
+
+        Returns:
+            SearchIndex: populated index.
+        """
+        index = cls()
+        for entity in mirror.entities.values():
+            index.add(entity)
+        return index
+
+    @classmethod
+    def from_cache(cls, cache, watch=True):
+        """Returns an index over every entity held in a ResponseCache (single entities as well
+        as the results of cached collection pages).
+
+        Parameters:
+            cache (ResponseCache): response cache.
+            watch (bool): keep the index up to date with entities cached later.
+
+        Returns:
+            SearchIndex: populated index.
+        """
+        index = cls()
+        for document in cache.documents():
+            index.add_document(document)
+        if watch:
+            index.watch(cache)
+        return index
+
+    def watch(self, cache):
+        """Registers the index with a ResponseCache so every newly stored response is indexed.
+
+        Parameters:
+            cache (ResponseCache): response cache.
+
+        Returns:
+            None
+        """
+        cache.listeners.append(lambda url, data: self.add_document(data))
+
+    def add_document(self, document):
+        """Indexes the entities of a decoded SWAPI response (an entity or a collection page).
+        Documents that are neither are ignored.
+
+        Parameters:
+            document (dict): decoded JSON document.
+
+        Returns:
+            int: number of entities indexed.
+        """
+        if isinstance(document.get('results'), list):
+            entities = document['results']
+        else:
+            entities = [document]
+        count = 0
+        for entity in entities:
+            if isinstance(entity, dict) and resource_of(entity.get('url', '')):
+                self.add(entity)
+                count += 1
+        return count
+
+    def add(self, entity, resource=None):
+        """Indexes an entity, replacing a previously indexed entity with the same url.
+
+        Parameters:
+            entity (dict): SWAPI entity with a 'url'.
+            resource (str): collection name (derived from the url if not provided).
+
+        Returns:
+            None
+        """
+        url = canonical_url(entity['url'])
+        resource = resource or resource_of(url)
+        texts = [
+            entity[field].lower() for field in SEARCH_FIELDS.get(resource, ('name',))
+            if isinstance(entity.get(field), str)
+        ]
+        with self._lock:
+            self._remove(url)
+            self.entities[url] = entity
+            entry_ids = self._entry_ids[url] = []
+            for text in texts:
+                entry_id = self._next_id
+                self._next_id += 1
+                grams = trigrams(text)
+                self._entries[entry_id] = (url, resource, text, len(grams))
+                entry_ids.append(entry_id)
+                for gram in grams:
+                    self._postings.setdefault(gram, set()).add(entry_id)
+
+    def remove(self, url):
+        """Removes an entity from the index (no-op if it is not indexed).
+
+        Parameters:
+            url (str): entity url.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._remove(canonical_url(url))
+
+    def _remove(self, url):
+        self.entities.pop(url, None)
+        for entry_id in self._entry_ids.pop(url, ()):
+            text = self._entries.pop(entry_id)[2]
+            for gram in trigrams(text):
+                postings = self._postings[gram]
+                postings.discard(entry_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def search(self, term, resource=None, limit=10):
+        """Returns the entities whose search fields contain a term, ranked exact matches first,
+        then prefix matches, then by field length (shorter fields are closer matches).
+
+        Parameters:
+            term (str): search term (case-insensitive substring).
+            resource (str): optional collection name to restrict the search to.
+            limit (int): maximum number of candidates (None for all).
+
+        Returns:
+            list: matching entities, best first.
+        """
+        term = term.lower()
+        grams = trigrams(term, padded=False)
+        with self._lock:
+            if grams:
+                postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+                candidates = set.intersection(*postings)
+            else:
+                candidates = self._entries.keys()
+            ranked = {}
+            for entry_id in candidates:
+                url, entry_resource, text, count = self._entries[entry_id]
+                if resource is not None and entry_resource != resource or term not in text:
+                    continue
+                rank = (text != term, not text.startswith(term), len(text), entry_id)
+                if url not in ranked or rank < ranked[url]:
+                    ranked[url] = rank
+            urls = sorted(ranked, key=ranked.get)[:limit]
+            return [self.entities[url] for url in urls]
+
+    def fuzzy(self, term, resource=None, limit=10, min_score=FUZZY_MIN_SCORE):
+        """Returns the entities whose search fields are most similar to a term, tolerating
+        typos and word order. Similarity is the Jaccard index of the padded trigram sets.
+        A candidate scoring at least min_score shares at least min_score * len(grams) trigrams
+        with the term, so it must appear in one of the rarest postings; only those are scanned
+        for candidates and the remaining postings are only probed.
+
+        Parameters:
+            term (str): search term.
+            resource (str): optional collection name to restrict the search to.
+            limit (int): maximum number of candidates.
+            min_score (float): minimum similarity (0 to 1) of a candidate.
+
+        Returns:
+            list: (score, entity) tuples, best first.
+        """
+        grams = trigrams(term)
+        scanned = len(grams) - max(1, math.ceil(min_score * len(grams))) + 1
+        with self._lock:
+            postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+            shared = Counter()
+            for entry_ids in postings[:scanned]:
+                shared.update(entry_ids)
+            for entry_ids in postings[scanned:]:
+                for entry_id in shared:
+                    if entry_id in entry_ids:
+                        shared[entry_id] += 1
+            scores = {}
+            for entry_id, common in shared.items():
+                url, entry_resource, text, count = self._entries[entry_id]
+                if resource is not None and entry_resource != resource:
+                    continue
+                score = common / (len(grams) + count - common)
+                if score >= min_score and score > scores.get(url, (0,))[0]:
+                    scores[url] = (score, entry_id)
+            urls = sorted(scores, key=lambda url: (-scores[url][0], scores[url][1]))[:limit]
+            return [(scores[url][0], self.entities[url]) for url in urls]
+
+    def best_match(self, term, resource=None):
+        """Returns the best candidate for a term: the top substring match if there is one,
+        otherwise the most similar fuzzy match.
+
+        Parameters:
+            term (str): search term.
+            resource (str): optional collection name to restrict the search to.
+
+        Returns:
+            dict: the entity, or None if nothing matches.
+        """
+        matches = self.search(term, resource, limit=1)
+        if matches:
+            return matches[0]
+        matches = self.fuzzy(term, resource, limit=1)
+        return matches[0][1] if matches else None
@@ -0,0 +1,383 @@
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from swapi_assignment import (
+    ENDPOINT, LIST_PROPS, PEOPLE_KEYS, PLANET_KEYS, SPECIES_KEYS, STARSHIP_KEYS, VEHICLE_KEYS
+)
+from swapi_client import SwapiClient
+from swapi_mirror import SearchTable
+from swapi_search import resource_of
+from swapi_stats import percentile
+
+FIXTURE_FILES = (
+    'swapi_planets-v1p0.json',
+    'swapi_echo_base-v1p0.json',
+    'swapi_echo_base-v1p1.json',
+    'swapi_planets_uninhabited-v1p1.json',
+)
+PAGE_SIZE = 10  # entities per collection page, as on SWAPI
+
+# resource -> keys served for entities of that resource
+RESOURCE_KEYS = {
+    'people': PEOPLE_KEYS,
+    'planets': PLANET_KEYS,
+    'species': SPECIES_KEYS,
+    'starships': STARSHIP_KEYS,
+    'vehicles': VEHICLE_KEYS,
+}
+
+
+def to_raw(value, key=None):
+    """Converts a cleaned value back to the string form SWAPI serves (None -> 'unknown',
+    numbers -> strings, lists -> comma-separated strings, nested entities -> urls). Raw values
+    are returned unchanged.
+
+    Parameters:
+        value (object): cleaned or raw value.
+        key (str): key of the value.
+
+    Returns:
+        object: raw SWAPI value.
+    """
+    if value is None:
+        return 'unknown'
+    if key == 'homeworld' and isinstance(value, dict):
+        return value['url']
+    if key == 'species' and isinstance(value, list):
+        return [item['url'] if isinstance(item, dict) else item for item in value]
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return str(value)
+    if key in LIST_PROPS and isinstance(value, list):
+        return ', '.join(value)
+    return value
+
+
+def build_fixtures(filepaths=FIXTURE_FILES, root=ENDPOINT):
+    """Collects the SWAPI entities found anywhere in local JSON files (raw or cleaned) and
+    returns them in raw SWAPI form. Fields added by base documents are dropped; when an entity
+    appears several times its fields are merged, earlier files taking precedence.
+
+    Parameters:
+        filepaths (tuple): JSON files to harvest.
+        root (str): SWAPI root url the entity urls start with.
+
+    Returns:
+        dict: resource -> {url: entity} in first-seen order.
+    """
+    merged = {}
+
+    def harvest(value):
+        if isinstance(value, dict):
+            url = value.get('url')
+            resource = resource_of(url) if isinstance(url, str) and url.startswith(root) else None
+            if resource in RESOURCE_KEYS:
+                entity = merged.setdefault(url, {})
+                for key in RESOURCE_KEYS[resource]:
+                    if key in value:
+                        entity.setdefault(key, to_raw(value[key], key))
+            for item in value.values():
+                harvest(item)
+        elif isinstance(value, list):
+            for item in value:
+                harvest(item)
+
+    for filepath in filepaths:
+        with open(filepath, 'r', encoding='utf8') as file_obj:
+            harvest(json.load(file_obj))
+
+    fixtures = {resource: {} for resource in RESOURCE_KEYS}
+    for url, entity in merged.items():
+        keys = RESOURCE_KEYS[resource_of(url)]
+        fixtures[resource_of(url)][url] = {key: entity[key] for key in keys if key in entity}
+    return fixtures
+
+
+class StandinServer:
+    """Local HTTP stand-in for SWAPI serving fixture entities with SWAPI's url layout, paging
+    and case-insensitive ?search= semantics. Documents keep the SWAPI urls of the fixtures, so
+    outputs and cache keys match the live service; clients reach the stand-in through
+    route_client(), or rewrite_urls points the served urls at the stand-in. Every response
+    can be delayed (latency plus uniform jitter) and a share of them replaced by injected
+    errors. Responses carry an ETag and honor If-None-Match.
+
+    Parameters:
+        fixtures (dict): resource -> {url: entity} (see build_fixtures).
+        host (str): interface to bind.
+        port (int): port to bind (0 picks a free port).
+        latency (float): seconds added to every response.
+        jitter (float): maximum extra random seconds added to every response.
+        error_rate (float): share (0 to 1) of requests answered with error_status.
+        error_status (int): status code of injected errors.
+        root (str): SWAPI root url of the fixture urls.
+        rewrite_urls (bool): serve urls under the stand-in's endpoint instead of root.
+    """
+
+    def __init__(self, fixtures, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=503, root=ENDPOINT, rewrite_urls=False):
+        self.fixtures = fixtures
+        self.rewrite_urls = rewrite_urls
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.root = root
+        self.metrics = {'requests': 0, 'errors': 0}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._search = {}  # resource -> SearchTable (the mirror's ?search= matching)
+        for resource, entities in fixtures.items():
+            table = self._search[resource] = SearchTable(resource)
+            for entity in entities.values():
+                table.add(entity)
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def endpoint(self):
+        """Root url of the stand-in API (use in place of ENDPOINT)."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """Serves requests on a background thread and returns the server."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops serving and closes the socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def respond(self, path, query):
+        """Returns the (status, document) a request is answered with.
+
+        Parameters:
+            path (str): request path, e.g. /api/people/1/.
+            query (dict): querystring arguments.
+
+        Returns:
+            tuple: (status code, JSON-serializable document).
+        """
+        segments = [segment for segment in path.split('/') if segment]
+        if segments[:1] != ['api']:
+            return 404, {'detail': 'Not found'}
+        if len(segments) == 1:
+            return 200, {resource: f"{self.root}/{resource}/" for resource in self.fixtures}
+
+        resource = segments[1]
+        if resource not in self.fixtures:
+            return 404, {'detail': 'Not found'}
+        if len(segments) == 3:
+            entity = self.fixtures[resource].get(f"{self.root}/{resource}/{segments[2]}/")
+            return (200, entity) if entity is not None else (404, {'detail': 'Not found'})
+
+        results = self._search[resource].search(query.get('search', ''))
+        try:
+            page = int(query.get('page', 1))
+        except ValueError:
+            return 404, {'detail': 'Invalid page.'}
+        pages = max(1, -(-len(results) // PAGE_SIZE))
+        if not 1 <= page <= pages:
+            return 404, {'detail': 'Invalid page.'}
+
+        def page_url(number):
+            if not 1 <= number <= pages:
+                return None
+            params = {'search': query['search']} if 'search' in query else {}
+            params['page'] = number
+            return f"{self.root}/{resource}/?{urlencode(params)}"
+
+        return 200, {
+            'count': len(results),
+            'next': page_url(page + 1),
+            'previous': page_url(page - 1),
+            'results': results[(page - 1) * PAGE_SIZE:page * PAGE_SIZE],
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # headers and body are sent in separate writes
+
+            def do_GET(self):
+                delay = server.latency + random.uniform(0, server.jitter)
+                if delay:
+                    time.sleep(delay)
+                parts = urlsplit(self.path)
+                with server._lock:
+                    server.metrics['requests'] += 1
+                    failed = random.random() < server.error_rate
+                    if failed:
+                        server.metrics['errors'] += 1
+                if failed:
+                    status, document = server.error_status, {'detail': 'Injected error'}
+                else:
+                    status, document = server.respond(parts.path, dict(parse_qsl(parts.query)))
+
+                body = json.dumps(document, ensure_ascii=False)
+                if server.rewrite_urls:
+                    body = body.replace(f'"{server.root}/', f'"{server.endpoint}/')
+                body = body.encode('utf-8')
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if status == 200:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class _RouteAdapter(HTTPAdapter):
+    """Transport adapter that sends requests for one url prefix to another prefix through the
+    adapter that serves the target (keeping its connection pool and counters)."""
+
+    def __init__(self, session, prefix, target):
+        super().__init__()
+        self.session = session
+        self.prefix = prefix
+        self.target = target
+
+    def send(self, request, **kwargs):
+        request.url = self.target + request.url[len(self.prefix):]
+        return self.session.get_adapter(request.url).send(request, **kwargs)
+
+
+def route_client(server, client=None):
+    """Routes a SwapiClient's requests for SWAPI urls to a stand-in server, so unchanged code
+    (e.g., main(client=route_client(server))) runs against the stand-in.
+
+    Parameters:
+        server (StandinServer): running stand-in.
+        client (SwapiClient): client to route (a new one is created if not provided).
+
+    Returns:
+        SwapiClient: the routed client.
+    """
+    if client is None:
+        client = SwapiClient()
+    client.session.mount(
+        server.root + '/', _RouteAdapter(client.session, server.root + '/', server.endpoint + '/')
+    )
+    return client
+
+
+def run_load(urls, rps, duration, fetch, concurrency=32):
+    """Drives a fetch function at a target request rate (open loop: requests are scheduled at
+    fixed intervals whether or not earlier ones finished) and reports throughput and latency
+    percentiles. Latency is measured from each request's scheduled start, so queueing behind
+    slow requests is included.
+
+    Parameters:
+        urls (list): urls requested in turn.
+        rps (float): target requests per second.
+        duration (float): seconds to generate load for.
+        fetch (function): fetch(url) returning a response (status >= 400 counts as an error)
+            or raising, e.g. the get() of a client routed with route_client().
+        concurrency (int): maximum requests in flight.
+
+    Returns:
+        dict: requests, errors, seconds, target/achieved throughput and latency percentiles
+        in milliseconds.
+    """
+    total = max(1, int(rps * duration))
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def one(i, scheduled):
+        try:
+            response = fetch(urls[i % len(urls)])
+            failed = getattr(response, 'status_code', 200) >= 400
+        except Exception:
+            failed = True
+        latency = time.perf_counter() - scheduled
+        with lock:
+            latencies.append(latency)
+            errors[0] += failed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i in range(total):
+            scheduled = start + i / rps
+            pause = scheduled - time.perf_counter()
+            if pause > 0:
+                time.sleep(pause)
+            executor.submit(one, i, scheduled)
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': total,
+        'errors': errors[0],
+        'seconds': seconds,
+        'target_rps': rps,
+        'achieved_rps': total / seconds,
+        'latency_ms': {
+            name: percentile(latencies, share) * 1000
+            for name, share in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('max', 1.0))
+        },
+    }
+
+
+def main():
+    """Runs the stand-in. 'serve [port]' serves until interrupted; 'load [rps] [seconds]' runs
+    the load generator against an in-process stand-in with 20 ms +/- 10 ms latency and 1%
+    injected errors and prints the report."""
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'load'
+    fixtures = build_fixtures()
+    if mode == 'serve':
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+        server = StandinServer(fixtures, port=port, rewrite_urls=True)
+        print(f"serving {sum(map(len, fixtures.values()))} entities at {server.endpoint}")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            server.httpd.server_close()
+        return
+
+    rps = float(sys.argv[2]) if len(sys.argv) > 2 else 100
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+    with StandinServer(fixtures, latency=0.02, jitter=0.01, error_rate=0.01) as server:
+        client = route_client(server, SwapiClient(max_retries=0))
+        urls = [url for entities in fixtures.values() for url in entities]
+        report = run_load(urls, rps, duration, client.get)
+    latency = '  '.join(f"{name} {value:.1f} ms" for name, value in report['latency_ms'].items())
+    print(f"{report['requests']} requests in {report['seconds']:.2f}s "
+          f"({report['achieved_rps']:.1f}/s of {report['target_rps']:.1f}/s), "
+          f"{report['errors']} errors  {latency}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+import functools
+import json
+import math
+import re
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit, urlunsplit
+
+TOP_SLOW = 5  # slowest fetches listed in the summary
+ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+# active Recorder; None leaves instrumentation off (the hooks then cost one global lookup)
+recorder = None
+
+_local = threading.local()
+
+
+def percentile(sorted_values, share):
+    """Returns the nearest-rank percentile of sorted values.
+
+    Parameters:
+        sorted_values (list): values in ascending order.
+        share (float): percentile as a share (e.g., 0.99).
+
+    Returns:
+        float: the percentile, or 0.0 for no values.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(share * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def url_template(url):
+    """Returns a url with numeric path segments replaced by {id} and the querystring dropped,
+    e.g. https://swapi.co/api/people/{id}/.
+
+    Parameters:
+        url (str): a url that specifies the resource.
+
+    Returns:
+        str: url template.
+    """
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, ID_SEGMENT.sub('/{id}', parts.path), '', ''))
+
+
+def _distribution(seconds):
+    seconds = sorted(seconds)
+    return {
+        'count': len(seconds),
+        'total_ms': sum(seconds) * 1000,
+        'p50_ms': percentile(seconds, 0.5) * 1000,
+        'p95_ms': percentile(seconds, 0.95) * 1000,
+        'p99_ms': percentile(seconds, 0.99) * 1000,
+        'max_ms': (seconds[-1] if seconds else 0.0) * 1000,
+    }
+
+
+class Recorder:
+    """Collects per-call records while instrumentation is enabled: one record per SWAPI fetch
+    (url template, params, latency, bytes received, cache status, stage) and one per timed
+    function call or stage span.
+    """
+
+    def __init__(self):
+        self.fetches = []
+        self.calls = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_fetch(self, record):
+        with self._lock:
+            self.fetches.append(record)
+
+    def add_call(self, name, start, seconds, kind='call'):
+        with self._lock:
+            self.calls.append({
+                'name': name, 'kind': kind, 'stage': current_stage(),
+                'start': start - self.started, 'seconds': seconds,
+                'thread': threading.get_ident(),
+            })
+
+    def summary(self, top=TOP_SLOW):
+        """Returns the run summary: fetch counts by cache status and bytes received, latency
+        percentiles overall and per url template, the slowest fetches, and the time spent in
+        each timed function and stage (inclusive of nested calls).
+
+        Parameters:
+            top (int): number of slowest fetches to list.
+
+        Returns:
+            dict: summary.
+        """
+        with self._lock:
+            fetches = list(self.fetches)
+            calls = list(self.calls)
+
+        cache_status = {}
+        templates = {}
+        for record in fetches:
+            cache_status[record['cache']] = cache_status.get(record['cache'], 0) + 1
+            templates.setdefault(record['template'], []).append(record['seconds'])
+        timings = {}
+        for call in calls:
+            timings.setdefault((call['kind'], call['name']), []).append(call['seconds'])
+
+        slowest = sorted(fetches, key=lambda record: record['seconds'], reverse=True)[:top]
+        return {
+            'seconds': time.perf_counter() - self.started,
+            'fetches': dict(
+                _distribution([record['seconds'] for record in fetches]),
+                bytes_received=sum(record['bytes'] for record in fetches),
+                cache=cache_status,
+            ),
+            'templates': {template: _distribution(seconds) for template, seconds in templates.items()},
+            'slowest': [
+                dict({key: record[key] for key in ('url', 'params', 'stage', 'cache')},
+                     ms=record['seconds'] * 1000)
+                for record in slowest
+            ],
+            'stages': {
+                name: _distribution(seconds) for (kind, name), seconds in timings.items()
+                if kind == 'stage'
+            },
+            'functions': {
+                name: _distribution(seconds) for (kind, name), seconds in timings.items()
+                if kind == 'call'
+            },
+        }
+
+    def format_summary(self, top=TOP_SLOW):
+        """Returns the run summary as printable text (see summary)."""
+        summary = self.summary(top)
+        fetches = summary['fetches']
+        cache = ', '.join(f"{status} {count}" for status, count in sorted(fetches['cache'].items()))
+        lines = [
+            f"run: {summary['seconds']:.3f}s",
+            f"fetches: {fetches['count']} ({cache or 'none'}), "
+            f"{fetches['bytes_received']} bytes received, "
+            f"p50 {fetches['p50_ms']:.1f} ms  p95 {fetches['p95_ms']:.1f} ms  "
+            f"p99 {fetches['p99_ms']:.1f} ms",
+        ]
+        for title in ('templates', 'stages', 'functions'):
+            if summary[title]:
+                lines.append(f"{title}:")
+            for name, stats in summary[title].items():
+                lines.append(
+                    f"  {name}: {stats['count']} calls  {stats['total_ms']:.1f} ms total  "
+                    f"p50 {stats['p50_ms']:.2f}  p95 {stats['p95_ms']:.2f}  "
+                    f"p99 {stats['p99_ms']:.2f} ms"
+                )
+        if summary['slowest']:
+            lines.append('slowest fetches:')
+        for record in summary['slowest']:
+            params = f" {record['params']}" if record['params'] else ''
+            lines.append(
+                f"  {record['ms']:.1f} ms  {record['url']}{params}  "
+                f"[{record['cache']}, {record['stage'] or '-'}]"
+            )
+        return '\n'.join(lines)
+
+    def write_trace(self, filepath):
+        """Writes every record as a Chrome trace event file (viewable in chrome://tracing or
+        Perfetto).
+
+        Parameters:
+            filepath (str): path to the trace file.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            events = [
+                {
+                    'name': record['template'], 'cat': 'fetch', 'ph': 'X',
+                    'ts': record['start'] * 1e6, 'dur': record['seconds'] * 1e6,
+                    'pid': 0, 'tid': record['thread'],
+                    'args': {key: record[key] for key in ('url', 'params', 'bytes', 'cache', 'stage')},
+                }
+                for record in self.fetches
+            ] + [
+                {
+                    'name': call['name'], 'cat': call['kind'], 'ph': 'X',
+                    'ts': call['start'] * 1e6, 'dur': call['seconds'] * 1e6,
+                    'pid': 0, 'tid': call['thread'], 'args': {'stage': call['stage']},
+                }
+                for call in self.calls
+            ]
+        with open(filepath, 'w', encoding='utf-8') as file_obj:
+            json.dump({'traceEvents': events}, file_obj, ensure_ascii=False)
+
+
+def enable():
+    """Turns instrumentation on with a new Recorder and returns it."""
+    global recorder
+    recorder = Recorder()
+    return recorder
+
+
+def disable():
+    """Turns instrumentation off and returns the Recorder that was active (or None)."""
+    global recorder
+    active, recorder = recorder, None
+    return active
+
+
+def current_stage():
+    """Returns the stage the calling thread is in, or None."""
+    return getattr(_local, 'stage', None)
+
+
+@contextmanager
+def stage(name):
+    """Context manager that labels the calling thread's fetches and calls with a stage name and
+    records the stage's duration. A no-op while instrumentation is off."""
+    active = recorder
+    if active is None:
+        yield
+        return
+    previous = current_stage()
+    _local.stage = name
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _local.stage = previous
+        active.add_call(name, start, time.perf_counter() - start, 'stage')
+
+
+def in_stage(name, func, *args, **kwargs):
+    """Calls a function with the calling thread labelled with a stage name, without recording
+    another stage span. Pool workers use it to keep the stage of the thread that submitted the
+    work, e.g. executor.submit(in_stage, current_stage(), func, *args)."""
+    previous = current_stage()
+    _local.stage = name
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _local.stage = previous
+
+
+def timed(func):
+    """Decorator that records the duration of every call of a function while instrumentation
+    is on."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        active = recorder
+        if active is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            active.add_call(func.__name__, start, time.perf_counter() - start)
+
+    return wrapper
+
+
+def start_fetch(url, params):
+    """Opens the record of a SWAPI fetch on the calling thread (see note and finish_fetch).
+
+    Parameters:
+        url (str): a url that specifies the resource.
+        params (dict): optional dictionary of querystring arguments.
+
+    Returns:
+        dict: the open record, or None while instrumentation is off.
+    """
+    if recorder is None:
+        return None
+    record = {
+        'url': url, 'template': url_template(url), 'params': dict(params or {}),
+        'bytes': 0, 'cache': 'none', 'stage': current_stage(),
+        'thread': threading.get_ident(), 'start': time.perf_counter(),
+    }
+    _local.fetch = record
+    return record
+
+
+def note(**fields):
+    """Adds fields (e.g., cache='hit', bytes=1234) to the fetch open on the calling thread.
+    Ignored when no fetch is open."""
+    record = getattr(_local, 'fetch', None)
+    if record is not None:
+        if 'bytes' in fields:
+            fields['bytes'] += record['bytes']
+        record.update(fields)
+
+
+def finish_fetch(record):
+    """Closes a record opened by start_fetch() and hands it to the recorder."""
+    if record is None:
+        return
+    _local.fetch = None
+    active = recorder
+    if active is not None:
+        record['seconds'] = time.perf_counter() - record['start']
+        record['start'] -= active.started
+        active.add_fetch(record)
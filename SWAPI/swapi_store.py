@@ -0,0 +1,228 @@
+import json
+import mmap
+import struct
+from collections.abc import Mapping
+
+JSONL = 'jsonl'
+BINARY = 'binary'
+STORE_FORMATS = (JSONL, BINARY)
+BINARY_MAGIC = b'SWAPIREC\x01'
+INDEX_SUFFIX = '.idx'
+
+_DOUBLE = struct.Struct('<d')
+
+
+def index_path(filepath):
+    """Returns the path of the sidecar offset index of a store file."""
+    return filepath + INDEX_SUFFIX
+
+
+def _write_varint(out, number):
+    while number > 0x7f:
+        out.append(number & 0x7f | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def _read_varint(buffer, pos):
+    number = shift = 0
+    while True:
+        byte = buffer[pos]
+        pos += 1
+        number |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return number, pos
+        shift += 7
+
+
+def _encode(out, value, keys, default):
+    """Appends the binary encoding of a JSON-compatible value. Dictionary keys are written as
+    ids into the shared key table (keys: key -> id)."""
+    if value is None:
+        out.append(0x4e)  # N
+    elif value is True:
+        out.append(0x54)  # T
+    elif value is False:
+        out.append(0x46)  # F
+    elif isinstance(value, int):
+        out.append(0x69)  # i: zigzag varint
+        _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+    elif isinstance(value, float):
+        out.append(0x64)  # d: little-endian double
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        out.append(0x73)  # s
+        _write_varint(out, len(data))
+        out += data
+    elif isinstance(value, (list, tuple)):
+        out.append(0x6c)  # l
+        _write_varint(out, len(value))
+        for item in value:
+            _encode(out, item, keys, default)
+    elif isinstance(value, dict):
+        out.append(0x6d)  # m
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            _write_varint(out, keys.setdefault(key, len(keys)))
+            _encode(out, item, keys, default)
+    elif default is not None:
+        _encode(out, default(value), keys, default)
+    else:
+        raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def _decode(buffer, pos, keys):
+    """Decodes one binary value starting at pos and returns (value, next position)."""
+    tag = buffer[pos]
+    pos += 1
+    if tag == 0x4e:
+        return None, pos
+    if tag == 0x54:
+        return True, pos
+    if tag == 0x46:
+        return False, pos
+    if tag == 0x69:
+        number, pos = _read_varint(buffer, pos)
+        return (number >> 1) ^ -(number & 1), pos
+    if tag == 0x64:
+        return _DOUBLE.unpack_from(buffer, pos)[0], pos + 8
+    if tag == 0x73:
+        length, pos = _read_varint(buffer, pos)
+        return str(buffer[pos:pos + length], 'utf-8'), pos + length
+    if tag == 0x6c:
+        count, pos = _read_varint(buffer, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _decode(buffer, pos, keys)
+            items.append(item)
+        return items, pos
+    if tag == 0x6d:
+        count, pos = _read_varint(buffer, pos)
+        data = {}
+        for _ in range(count):
+            key_id, pos = _read_varint(buffer, pos)
+            data[keys[key_id]], pos = _decode(buffer, pos, keys)
+        return data, pos
+    raise ValueError(f"corrupt binary record (tag {tag:#x} at offset {pos - 1})")
+
+
+def _entity_url(entity):
+    if isinstance(entity, Mapping):
+        return entity.get('url')
+    return getattr(entity, 'url', None)
+
+
+def write_store(filepath, entities, file_format=JSONL, default=None):
+    """Writes entities one record at a time to a JSON Lines file (one compact JSON document per
+    line) or to a compact binary record file, plus a sidecar offset index keyed by entity url
+    (filepath + '.idx') that EntityStore uses for point lookups.
+
+    Parameters:
+        filepath (str): the path to the file.
+        entities (iterable): entities to write (e.g., a generator); records without a url are
+            only reachable by position.
+        file_format (str): 'jsonl' or 'binary'.
+        default (function): optional function returning a serializable version of objects
+            that cannot be encoded (e.g., swapi_records.to_json).
+
+    Returns:
+        int: number of entities written.
+    """
+    if file_format not in STORE_FORMATS:
+        raise ValueError(f"unknown store format {file_format!r}")
+
+    offsets = []
+    urls = {}
+    keys = {}
+    with open(filepath, 'wb') as file_obj:
+        position = 0
+        if file_format == BINARY:
+            position = file_obj.write(BINARY_MAGIC)
+        for entity in entities:
+            if file_format == JSONL:
+                text = json.dumps(entity, ensure_ascii=False, default=default)
+                payload = (text + '\n').encode('utf-8')
+            else:
+                payload = bytearray()
+                _encode(payload, entity, keys, default)
+            url = _entity_url(entity)
+            if url is not None:
+                urls[url] = len(offsets)
+            offsets.append((position, len(payload)))
+            position += file_obj.write(payload)
+
+    index = {'format': file_format, 'keys': list(keys), 'offsets': offsets, 'urls': urls}
+    with open(index_path(filepath), 'w', encoding='utf-8') as file_obj:
+        json.dump(index, file_obj, ensure_ascii=False, separators=(',', ':'))
+    return len(offsets)
+
+
+class EntityStore:
+    """Random-access reader of a file written by write_store(). The file is memory-mapped and
+    only the requested records are decoded, so a point lookup by url costs one dictionary
+    probe and one record decode regardless of the file size.
+
+    Parameters:
+        filepath (str): the path to the file (its sidecar index must exist).
+    """
+
+    def __init__(self, filepath):
+        with open(index_path(filepath), 'r', encoding='utf-8') as file_obj:
+            index = json.load(file_obj)
+        self.filepath = filepath
+        self.file_format = index['format']
+        self.urls = index['urls']
+        self._keys = index['keys']
+        self._offsets = index['offsets']
+        self._file = open(filepath, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty files cannot be mapped
+            self._map = b''
+        if self.file_format == BINARY and self._map[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+            self.close()
+            raise ValueError(f"{filepath} is not a binary record file")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, url):
+        return url in self.urls
+
+    def __getitem__(self, position):
+        offset, length = self._offsets[position]
+        if self.file_format == JSONL:
+            return json.loads(self._map[offset:offset + length])
+        return _decode(self._map, offset, self._keys)[0]
+
+    def __iter__(self):
+        for position in range(len(self._offsets)):
+            yield self[position]
+
+    def close(self):
+        """Unmaps and closes the file."""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def get(self, url, default=None):
+        """Returns the entity with a url, decoding only that record.
+
+        Parameters:
+            url (str): entity url.
+            default (object): value returned when no entity has the url.
+
+        Returns:
+            dict: decoded entity, or default.
+        """
+        position = self.urls.get(url)
+        if position is None:
+            return default
+        return self[position]
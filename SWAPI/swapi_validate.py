@@ -0,0 +1,290 @@
+import re
+import sys
+from collections.abc import Mapping
+
+from swapi_assignment import read_json, read_json_array
+
+README_FILE = 'swapi_assignment_readme.py'
+MAX_EXAMPLES = 20  # concrete violation paths kept in a report
+
+HEADING = re.compile(r'###\s+(.+?)\s*$')
+TABLE_ROW = re.compile(r'\|\s*(\d+)\s*\|([^|]*)\|([^|]*)\|([^|]*)\|')
+
+# documented type name -> Python types a cleaned value may have (None stands for unknown values)
+TYPE_NAMES = {
+    'str': (str,),
+    'int': (int,),
+    'float': (float, int),
+    'list': (list,),
+    'dict': (dict, list),  # nested entities; species holds a list of them
+    'bool': (bool,),
+}
+
+# entity -> key -> entity of the nested value(s) validated in turn; keys bound here are not
+# reported as unexpected
+NESTED_ENTITIES = {
+    'person': {'homeworld': 'planet', 'species': 'species'},
+    'starship': {
+        'pilot': 'person', 'copilot': 'person', 'astromech_droid': 'person',
+        'passenger_manifest': 'person', 'escorts': 'starship',
+    },
+    'vehicle': {'pilot': 'person'},
+}
+
+# path of keys (or '*' for every list item) -> entity found there in swapi_echo_base-v1p1.json
+ECHO_BASE_ENTITIES = {
+    ('location', 'planet'): 'planet_hoth',
+    ('garrison', 'commander'): 'person',
+    ('vehicle_assets', 'snowspeeders', '*', 'type'): 'vehicle',
+    ('starship_assets', 'starfighters', '*', 'type'): 'starship',
+    ('starship_assets', 'transports', '*', 'type'): 'starship',
+    ('visiting_starships', 'freighters', '*'): 'starship',
+    ('evacuation_plan', 'transport_assignments', '*'): 'starship',
+}
+
+# (readme path, strict) -> compiled checkers
+compiled_checkers = {}
+
+
+def entity_name(heading):
+    """Returns the entity name of a readme heading, e.g. 'Species (SWAPI)' -> 'species'."""
+    return re.sub(r'\s*\(.*?\)', '', heading).strip().lower().replace(' ', '_')
+
+
+def load_schemas(filepath=README_FILE):
+    """Parses the entity type tables of the assignment readme (Appendix B). A field's documented
+    type is its 'convert to' type, or its 'value type' when no conversion applies.
+
+    Parameters:
+        filepath (str): path to the readme.
+
+    Returns:
+        dict: entity name -> tuple of (key, type name) pairs in insert order.
+    """
+    schemas = {}
+    heading = None
+    with open(filepath, 'r', encoding='utf-8') as file_obj:
+        for line in file_obj:
+            match = HEADING.match(line)
+            if match:
+                heading = entity_name(match.group(1))
+                continue
+            match = TABLE_ROW.match(line.strip())
+            if match and heading is not None:
+                _, key, value_type, convert_to = (cell.strip() for cell in match.groups())
+                schemas.setdefault(heading, []).append((key, convert_to or value_type))
+    return {name: tuple(fields) for name, fields in schemas.items()}
+
+
+def compile_checkers(schemas, nested=NESTED_ENTITIES, strict=False):
+    """Compiles entity schemas into checker functions. A checker validates one entity and calls
+    report(path, message) for every violation: a value whose type is not the documented one
+    (None is always accepted, since unknown values are cleaned to None) and, in strict mode, a
+    documented key that is missing or an undocumented key that is not a nested entity.
+
+    Parameters:
+        schemas (dict): entity name -> (key, type name) pairs returned by load_schemas().
+        nested (dict): entity name -> key -> entity of nested values.
+        strict (bool): also report missing and unexpected keys.
+
+    Returns:
+        dict: entity name -> checker(entity, path, report).
+    """
+    checkers = {}
+
+    def compile_entity(name, fields):
+        bindings = nested.get(name, {})
+        plan = []
+        for key, type_name in fields:
+            if type_name not in TYPE_NAMES:
+                raise ValueError(f"{name}.{key}: unknown documented type {type_name!r}")
+            plan.append((key, TYPE_NAMES[type_name], type_name, bindings.get(key)))
+        plan = tuple(plan)
+        bound = tuple((key, entity) for key, entity in bindings.items()
+                      if key not in dict(fields))
+        documented = frozenset(key for key, _ in fields) | frozenset(bindings)
+
+        def check(entity, path, report):
+            if not isinstance(entity, Mapping):
+                report(path, f"expected {name} object, found {type(entity).__name__}")
+                return
+            for key, types, type_name, child in plan:
+                value = entity.get(key, check)  # the checker itself marks a missing key
+                if value is check:
+                    if strict:
+                        report(path + (key,), 'missing')
+                    continue
+                if value is None:
+                    continue
+                if type(value) not in types and not (
+                        dict in types and isinstance(value, Mapping)):  # e.g., an Overlay
+                    report(path + (key,), f"expected {type_name}, found {type(value).__name__}")
+                elif child is not None:
+                    check_nested(child, value, path + (key,), report)
+            for key, child in bound:
+                value = entity.get(key)
+                if value is not None:
+                    check_nested(child, value, path + (key,), report)
+            if strict:
+                for key in entity.keys() - documented:
+                    report(path + (key,), 'unexpected')
+
+        return check
+
+    def check_nested(name, value, path, report):
+        checker = checkers[name]
+        if type(value) is list:
+            for index, item in enumerate(value):
+                checker(item, path + (index,), report)
+        else:
+            checker(value, path, report)
+
+    for name, fields in schemas.items():
+        checkers[name] = compile_entity(name, fields)
+    return checkers
+
+
+def get_checkers(filepath=README_FILE, strict=False):
+    """Returns the checkers compiled from the readme, compiling them once per process."""
+    key = (filepath, strict)
+    checkers = compiled_checkers.get(key)
+    if checkers is None:
+        checkers = compiled_checkers[key] = compile_checkers(load_schemas(filepath), strict=strict)
+    return checkers
+
+
+def path_template(path):
+    """Returns a violation path with list indexes replaced by [*], e.g. '[*].homeworld.name'."""
+    return ''.join('[*]' if type(step) is int else f".{step}" for step in path).lstrip('.')
+
+
+def format_path(path):
+    """Returns a violation path as text, e.g. '[12].homeworld.name'."""
+    return ''.join(f"[{step}]" if type(step) is int else f".{step}" for step in path).lstrip('.')
+
+
+def new_report():
+    """Returns an empty validation report (see validate_file)."""
+    return {'records': 0, 'violations': 0, 'counts': {}, 'examples': []}
+
+
+def _reporter(report):
+    counts = report['counts']
+    examples = report['examples']
+
+    def add(path, message):
+        key = (path_template(path), message)
+        counts[key] = counts.get(key, 0) + 1
+        report['violations'] += 1
+        if len(examples) < MAX_EXAMPLES:
+            examples.append((format_path(path), message))
+
+    return add
+
+
+def _find(value, pattern, path=()):
+    """Yields (path, value) for every match of a path pattern ('*' matches every list item)."""
+    if not pattern:
+        yield path, value
+        return
+    step, rest = pattern[0], pattern[1:]
+    if step == '*':
+        if type(value) is list:
+            for index, item in enumerate(value):
+                yield from _find(item, rest, path + (index,))
+    elif isinstance(value, Mapping) and step in value:
+        yield from _find(value[step], rest, path + (step,))
+
+
+def validate_records(records, entity, checkers=None, report=None):
+    """Validates a stream of entities of one kind.
+
+    Parameters:
+        records (iterable): entities (e.g., a read_json_array() generator).
+        entity (str): entity name, e.g. 'planet'.
+        checkers (dict): compiled checkers (defaults to the readme's).
+        report (dict): optional report to add to.
+
+    Returns:
+        dict: validation report.
+    """
+    checkers = checkers or get_checkers()
+    report = report or new_report()
+    check = checkers[entity]
+    add = _reporter(report)
+    count = 0
+    for index, record in enumerate(records):
+        check(record, (index,), add)
+        count += 1
+    report['records'] += count
+    return report
+
+
+def validate_document(document, entities=ECHO_BASE_ENTITIES, checkers=None, report=None):
+    """Validates the entities found at known paths of a document (e.g., Echo Base).
+
+    Parameters:
+        document (dict): the document.
+        entities (dict): path pattern -> entity name.
+        checkers (dict): compiled checkers (defaults to the readme's).
+        report (dict): optional report to add to.
+
+    Returns:
+        dict: validation report.
+    """
+    checkers = checkers or get_checkers()
+    report = report or new_report()
+    add = _reporter(report)
+    for pattern, entity in entities.items():
+        for path, value in _find(document, pattern):
+            checkers[entity](value, path, add)
+            report['records'] += 1
+    return report
+
+
+def validate_file(filepath, entity=None, strict=False):
+    """Validates an output file against the readme's entity tables. Array files (e.g.,
+    swapi_planets_uninhabited-v1p1.json) are streamed one element at a time in constant memory
+    and every element is checked as entity; without an entity the file is read as an Echo Base
+    document.
+
+    Parameters:
+        filepath (str): path to the output file.
+        entity (str): entity of every array element, e.g. 'planet'.
+        strict (bool): also report missing and unexpected keys.
+
+    Returns:
+        dict: report with the number of 'records' checked, the number of 'violations', their
+        'counts' by (path template, message) and the first concrete 'examples'.
+    """
+    checkers = get_checkers(strict=strict)
+    if entity is not None:
+        return validate_records(read_json_array(filepath), entity, checkers)
+    return validate_document(read_json(filepath), checkers=checkers)
+
+
+def format_report(report):
+    """Returns a validation report as printable text."""
+    lines = [f"{report['records']} records checked, {report['violations']} violations"]
+    for (template, message), count in sorted(report['counts'].items(), key=lambda item: -item[1]):
+        lines.append(f"  {count:>8}  {template}: {message}")
+    if report['examples']:
+        lines.append('examples:')
+    for path, message in report['examples']:
+        lines.append(f"  {path}: {message}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """Validates a file given on the command line: swapi_validate.py <file> [entity] [--strict].
+    Exits with status 1 when violations are found."""
+    args = list(sys.argv[1:] if argv is None else argv)
+    strict = '--strict' in args
+    args = [arg for arg in args if arg != '--strict']
+    report = validate_file(args[0], args[1] if len(args) > 1 else None, strict)
+    print(format_report(report))
+    return 1 if report['violations'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())